@@ -0,0 +1,46 @@
+"""
+afop_core – the .rejuice format and color logic of the AFoP palette editor,
+without any GUI. Importing it pulls in neither tkinter nor NumPy; NumPy is
+loaded on first use by the functions that can take advantage of it.
+
+    from afop_core import PaletteStore, save_rejuice
+    store = PaletteStore.load("gearcamo_colorpalettes.rejuice")
+"""
+
+from .rejuice import (FIELDS, MARKER, apply_patches, atomic_write, hex_str_to_rgb,
+                      iter_rejuice, luma, parse_argb, parse_rejuice, rgb_to_hex_str,
+                      scan_entries, write_patches)
+from .backups import BackupLog
+from .store import (INDEX_ENABLED, INDEX_SUFFIX, NameTable, PaletteStore, read_index,
+                    save_rejuice, write_index)
+from .transforms import BULK_OPS, bulk_transform
+from .search import ColorIndex, SearchIndex, argb_to_lab
+from .diff import diff_report, diff_stores, merge_report, merge_stores, palette_keys
+from .workspace import Workspace
+from .watch import FileState, carry_edits, reparse_changed
+from .workers import load_worker, save_worker, watch_worker, workspace_worker
+from .profiling import PROFILE_TARGETS, PROFILER, Profiler, instrument
+from .render import (ATLAS_ROWS, HUE_STEPS, atlas_row_tops, atlas_swatch_box,
+                     hue_bar_ppm, sv_gradient_ppm, table_band_ppm)
+from .batch import apply_recolor, batch_file, check_spec, resolve_color
+from .textio import ROW_KEYS, export_rows, import_rows, read_rows, write_rows
+
+__all__ = [
+    "FIELDS", "MARKER", "apply_patches", "atomic_write", "hex_str_to_rgb",
+    "iter_rejuice", "luma", "parse_argb", "parse_rejuice", "rgb_to_hex_str",
+    "scan_entries", "write_patches",
+    "BackupLog",
+    "INDEX_ENABLED", "INDEX_SUFFIX", "NameTable", "PaletteStore", "read_index",
+    "save_rejuice", "write_index",
+    "BULK_OPS", "bulk_transform",
+    "ColorIndex", "SearchIndex", "argb_to_lab",
+    "diff_report", "diff_stores", "merge_report", "merge_stores", "palette_keys",
+    "Workspace",
+    "FileState", "carry_edits", "reparse_changed",
+    "load_worker", "save_worker", "watch_worker", "workspace_worker",
+    "PROFILE_TARGETS", "PROFILER", "Profiler", "instrument",
+    "ATLAS_ROWS", "HUE_STEPS", "atlas_row_tops", "atlas_swatch_box",
+    "hue_bar_ppm", "sv_gradient_ppm", "table_band_ppm",
+    "apply_recolor", "batch_file", "check_spec", "resolve_color",
+    "ROW_KEYS", "export_rows", "import_rows", "read_rows", "write_rows",
+]
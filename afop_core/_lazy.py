@@ -0,0 +1,17 @@
+"""
+Deferred optional imports, so importing afop_core stays cheap.
+"""
+
+_numpy = False          # not tried yet
+
+
+def numpy():
+    """The numpy module, imported on first use; None if it is not installed."""
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        _numpy = np
+    return _numpy
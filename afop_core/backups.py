@@ -0,0 +1,179 @@
+"""
+Backup generations: one full .bak snapshot plus a log of binary deltas, and
+the backups command.
+"""
+
+import mmap, os, shutil, struct, sys, time
+
+from .rejuice import apply_patches, atomic_write
+from .fileutil import file_state
+
+
+class BackupLog:
+    """
+    Keeps the last `keep` saved generations of a file as one full snapshot
+    (<file>.bak, generation 0) plus a log of binary deltas (<file>.bakdelta),
+    one record per save holding only the changed offsets and bytes:
+
+      header  "AFOPBAK1", <Qq  size, mtime_ns of the file when .bak was taken
+      record  <dQqI  time, size, mtime_ns after the save, patch count
+              then per patch <QHH offset, old len, new len + old + new bytes
+
+    A save costs a small append. The full copy is only made again when the
+    file no longer matches the last recorded state (edited by another tool,
+    or no backups yet).
+    """
+
+    MAGIC = b"AFOPBAK1"
+    _HEAD, _REC, _PATCH = struct.Struct("<Qq"), struct.Struct("<dQqI"), struct.Struct("<QHH")
+
+    def __init__(self, path, keep=10):
+        self.path = path
+        self.base = path + ".bak"
+        self.log  = path + ".bakdelta"
+        self.keep = keep
+
+    # ── log file ──────────────────────────────────────────────────────────────
+
+    def _read(self):
+        """(base state, [(time, state, patches)]) or None if missing / damaged."""
+        try:
+            with open(self.log, "rb") as f: raw = f.read()
+        except OSError:
+            return None
+        if not raw.startswith(self.MAGIC) or not os.path.exists(self.base):
+            return None
+        try:
+            pos = len(self.MAGIC)
+            base_state = self._HEAD.unpack_from(raw, pos); pos += self._HEAD.size
+            records = []
+            while pos < len(raw):
+                t, size, mtime, n = self._REC.unpack_from(raw, pos); pos += self._REC.size
+                patches = []
+                for _ in range(n):
+                    off, lo, ln = self._PATCH.unpack_from(raw, pos); pos += self._PATCH.size
+                    old, new = raw[pos:pos + lo], raw[pos + lo:pos + lo + ln]
+                    pos += lo + ln
+                    patches.append((off, old, new))
+                records.append((t, (size, mtime), patches))
+        except struct.error:
+            return None
+        return base_state, records
+
+    def _pack(self, rec):
+        t, (size, mtime), patches = rec
+        out = [self._REC.pack(t, size, mtime, len(patches))]
+        for off, old, new, *_ in patches:
+            out += [self._PATCH.pack(off, len(old), len(new)), old, new]
+        return b"".join(out)
+
+    def _write(self, base_state, records):
+        atomic_write(self.log, self.MAGIC + self._HEAD.pack(*base_state)
+                     + b"".join(map(self._pack, records)))
+
+    def _append(self, rec):
+        with open(self.log, "ab") as f:
+            f.write(self._pack(rec))
+            f.flush()
+            os.fsync(f.fileno())
+
+    # ── saving ────────────────────────────────────────────────────────────────
+
+    def prepare(self):
+        """
+        Call before writing the file. Makes sure the backups reproduce the file
+        as it is now, taking a fresh full snapshot if they do not.
+        """
+        parsed = self._read()
+        state  = file_state(self.path)
+        if parsed is not None:
+            base_state, records = parsed
+            if (records[-1][1] if records else base_state) == state:
+                return
+        shutil.copy2(self.path, self.base)
+        self._write(state, [])
+
+    def record(self, patches):
+        """Call after writing the file: log what changed as a new generation."""
+        if not patches:
+            return
+        self._append((time.time(), file_state(self.path),
+                      [(p[0], bytes(p[1]), bytes(p[2])) for p in patches]))
+        base_state, records = self._read()
+        if len(records) > self.keep:
+            self._fold(base_state, records, len(records) - self.keep)
+
+    def _fold(self, base_state, records, n):
+        """Merge the n oldest deltas into the base snapshot."""
+        merged = [p for _, _, patches in records[:n] for p in patches]
+        if all(len(old) == len(new) for _, old, new in merged):
+            with open(self.base, "r+b") as f, mmap.mmap(f.fileno(), 0) as mm:
+                for off, _, new in merged:
+                    mm[off:off + len(new)] = new
+                mm.flush()
+        else:
+            with open(self.base, "rb") as f: data = bytearray(f.read())
+            for _, _, patches in records[:n]:
+                apply_patches(data, patches)
+            atomic_write(self.base, data)
+        self._write(records[n-1][1], records[n:])
+
+    # ── restoring ─────────────────────────────────────────────────────────────
+
+    def generations(self):
+        """[(generation, time, values changed)]; generation 0 is the .bak snapshot."""
+        parsed = self._read()
+        if parsed is None:
+            return [(0, os.path.getmtime(self.base), 0)] if os.path.exists(self.base) else []
+        _, records = parsed
+        gens = [(0, os.path.getmtime(self.base), 0)]
+        gens += [(k, t, len(p)) for k, (t, _, p) in enumerate(records, 1)]
+        return gens
+
+    def restore(self, gen):
+        """Write generation gen back over the file, itself logged as a new save."""
+        parsed = self._read()
+        if parsed is None:
+            if gen != 0 or not os.path.exists(self.base):
+                raise ValueError(f"no backup generation {gen} for {self.path}")
+            shutil.copyfile(self.base, self.path)
+            return
+        base_state, records = parsed
+        if not 0 <= gen <= len(records):
+            raise ValueError(f"no backup generation {gen} for {self.path}")
+        with open(self.base, "rb") as f: data = bytearray(f.read())
+        for _, _, patches in records[:gen]:
+            apply_patches(data, patches)
+        later = [p for _, _, patches in records[gen:] for p in patches]
+        tip   = records[-1][1] if records else base_state
+        if (os.path.exists(self.path) and file_state(self.path) == tip
+                and all(len(old) == len(new) for _, old, new in later)):
+            # undo the later generations as one more delta, keeping them restorable
+            undo = {}
+            for _, _, patches in reversed(records[gen:]):
+                for off, old, new in patches:
+                    undo[off] = (undo[off][0] if off in undo else new, old)
+            atomic_write(self.path, data)
+            self.record([(off, cur, back) for off, (cur, back) in sorted(undo.items())])
+        else:
+            atomic_write(self.path, data)
+
+
+def run_backups(args):
+    backups = BackupLog(args.file)
+    try:
+        if args.restore is not None:
+            backups.restore(args.restore)
+            print(f"restored generation {args.restore} to {args.file}")
+            return 0
+        gens = backups.generations()
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    if not gens:
+        print(f"no backups for {args.file}")
+    for gen, t, n in gens:
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t))
+        print(f"#{gen:<3} {when}   " +
+              ("full snapshot (.bak)" if gen == 0 else f"{n} value(s) changed"))
+    return 0
@@ -0,0 +1,149 @@
+"""
+Headless batch recoloring.
+"""
+
+import argparse, fnmatch, json, re, sys, time
+
+from .rejuice import FIELDS, hex_str_to_rgb, rgb_to_hex_str
+from .store import INDEX_ENABLED, PaletteStore, save_rejuice
+
+_COLOR_RE = re.compile(r"#[0-9a-fA-F]{6}|0x[0-9a-fA-F]{8}")
+
+
+def resolve_color(color, alpha):
+    """
+    '#rrggbb' keeps the existing alpha byte, '0xaarrggbb' replaces it.
+    Returns the value as written to the file.
+    """
+    if not isinstance(color, str) or not _COLOR_RE.fullmatch(color):
+        raise ValueError(f"bad color {color!r} (want #rrggbb or 0xaarrggbb)")
+    if color.startswith("0x"):
+        color, alpha = hex_str_to_rgb(color)
+    return rgb_to_hex_str(color.lower(), alpha)
+
+
+def check_spec(spec):
+    """Validate a recolor spec up front so every worker sees the same errors."""
+    for name, c in spec.get("colors", {}).items():
+        for field, color in (c.items() if isinstance(c, dict) else [(None, c)]):
+            if field is not None and field not in FIELDS:
+                raise ValueError(f"{name}: unknown field {field!r}")
+            resolve_color(color, 0)
+    for rule in spec.get("rules", []):
+        if not isinstance(rule, dict) or "match" not in rule or "color" not in rule:
+            raise ValueError(f"rule needs 'match' and 'color': {rule!r}")
+        for field in rule.get("fields", ()):
+            if field not in FIELDS:
+                raise ValueError(f"rule {rule['match']!r}: unknown field {field!r}")
+        resolve_color(rule["color"], 0)
+
+
+def apply_recolor(store, spec):
+    """
+    Apply a recolor spec to a PaletteStore as edits. A spec is
+      {"colors": {name: color | {field: color}},
+       "rules":  [{"match": glob, "color": color, "fields": [...]}]}
+    where explicit names win over rules and later rules win over earlier ones.
+    Returns (number of changed values, unmatched names).
+    """
+    colors, rules = spec.get("colors", {}), spec.get("rules", [])
+    changed, seen = 0, set()
+    for i in range(len(store)):
+        name, targets = store.name(i), {}
+        for rule in rules:
+            if fnmatch.fnmatchcase(name, rule["match"]):
+                for field in rule.get("fields", FIELDS):
+                    targets[field] = rule["color"]
+        c = colors.get(name)
+        if c is not None:
+            seen.add(name)
+            targets.update(c if isinstance(c, dict) else dict.fromkeys(FIELDS, c))
+        for field, color in targets.items():
+            fi = FIELDS.index(field)
+            html, alpha = hex_str_to_rgb(store.text(i, fi))
+            if html is None:
+                continue                    # "—" slots have nothing to patch
+            nv = int(resolve_color(color, alpha), 16)
+            if nv != store.value(i, fi):
+                store.set(i, fi, nv); changed += 1
+    return changed, sorted(set(colors) - seen)
+
+
+def batch_file(path, spec, dry_run=False, backup=True, in_place=False, use_index=True):
+    """Recolor one file; runs in a worker process. Never raises."""
+    t0 = time.perf_counter()
+    result = {"path": path, "entries": 0, "changed": 0, "unmatched": [], "error": None}
+    try:
+        store = PaletteStore.load(path, use_index=use_index and INDEX_ENABLED)
+        changed, unmatched = apply_recolor(store, spec)
+        result.update(entries=len(store), changed=changed, unmatched=unmatched)
+        if changed and not dry_run:
+            save_rejuice(path, store, backup=backup, in_place=in_place, use_index=use_index)
+            missed = list(store.edits)
+            if missed:
+                raise IOError(f"{len(missed)} value(s) not found in the file")
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - t0
+    return result
+
+
+def parse_set(arg):
+    """NAME=COLOR or NAME:FIELD=COLOR from the command line."""
+    target, sep, color = arg.rpartition("=")
+    if not sep or not target:
+        raise argparse.ArgumentTypeError(f"expected NAME[:FIELD]=COLOR, got {arg!r}")
+    name, _, field = target.partition(":")
+    return name, field or None, color
+
+
+def run_batch(args):
+    spec = {"colors": {}, "rules": []}
+    if args.spec:
+        try:
+            with open(args.spec, encoding="utf-8") as f:
+                loaded = json.load(f)
+            if (not isinstance(loaded, dict)
+                    or not isinstance(loaded.get("colors", {}), dict)
+                    or not isinstance(loaded.get("rules", []), list)):
+                raise ValueError("a spec is a JSON object with a 'colors' object "
+                                 "and a 'rules' list")
+        except (OSError, ValueError) as e:
+            print(f"error: {args.spec}: {e}", file=sys.stderr)
+            return 2
+        spec["colors"].update(loaded.get("colors", {}))
+        spec["rules"] += loaded.get("rules", [])
+    for name, field, color in args.set or ():
+        if field is None:
+            spec["colors"][name] = color
+        else:
+            cur = spec["colors"].get(name)
+            cur = dict(cur) if isinstance(cur, dict) else dict.fromkeys(FIELDS, cur) if cur else {}
+            cur[field] = color
+            spec["colors"][name] = cur
+    try:
+        check_spec(spec)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    from concurrent.futures import ProcessPoolExecutor   # only the batch command needs it
+    failed, t0 = 0, time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        jobs = [pool.submit(batch_file, p, spec, args.dry_run, not args.no_backup,
+                            args.in_place, not args.no_index)
+                for p in args.files]
+        for job in jobs:
+            r = job.result()
+            if r["error"]:
+                failed += 1
+                print(f"FAIL  {r['path']}  {r['error']}  ({r['seconds']:.3f}s)")
+                continue
+            note = "  (dry run)" if args.dry_run and r["changed"] else ""
+            print(f"ok    {r['path']}  {r['changed']} values changed in "
+                  f"{r['entries']} entries{note}  ({r['seconds']:.3f}s)")
+            if r["unmatched"]:
+                print(f"      no entry named: {', '.join(r['unmatched'])}")
+    print(f"{len(args.files) - failed}/{len(args.files)} files ok "
+          f"in {time.perf_counter() - t0:.3f}s")
+    return 1 if failed else 0
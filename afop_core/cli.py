@@ -0,0 +1,118 @@
+"""
+Command line: the headless subcommands, plus profiling switches shared with
+the GUI. The GUI itself is passed in by the launcher so this module never
+imports Tk.
+"""
+
+import argparse, os
+
+from .profiling import instrument, PROFILER
+from .backups import run_backups
+from .batch import parse_set, run_batch
+from .diff import run_diff, run_merge
+from .textio import run_export, run_import
+
+COMMANDS = {"batch": run_batch, "backups": run_backups, "diff": run_diff,
+            "merge": run_merge, "export": run_export, "import": run_import}
+
+
+def _env_on(name):
+    """True when the environment variable is set to anything but "" or "0"."""
+    return os.environ.get(name, "") not in ("", "0")
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(description="AFoP CamoColorPalette Editor")
+    env = os.environ.get("AFOP_PROFILE", "")         # "" / "0": off, "1": default file
+    ap.add_argument("--profile", action="store_true", default=_env_on("AFOP_PROFILE"),
+                    help="time hot paths, show a timing overlay and dump stats "
+                         "to JSON on exit (env AFOP_PROFILE=1 or a file name)")
+    ap.add_argument("--profile-out", metavar="JSON",
+                    default=None if env in ("", "0", "1") else env,
+                    help="where --profile writes its stats (default afop_profile.json; "
+                         "implies --profile)")
+    ap.add_argument("--cprofile", metavar="PROF", default=os.environ.get("AFOP_CPROFILE") or None,
+                    help="write cProfile stats on exit (env AFOP_CPROFILE)")
+    ap.add_argument("--table-atlas", action="store_true", default=_env_on("AFOP_TABLE_ATLAS"),
+                    help="GUI: draw the table as band images instead of a canvas item "
+                         "per cell (env AFOP_TABLE_ATLAS)")
+    ap.add_argument("--save-in-place", action="store_true",
+                    default=_env_on("AFOP_SAVE_IN_PLACE"),
+                    help="GUI: Save patches the changed bytes instead of an atomic "
+                         "rewrite (env AFOP_SAVE_IN_PLACE)")
+    sub = ap.add_subparsers(dest="command")
+    b = sub.add_parser("batch", help="recolor .rejuice files without the GUI")
+    b.add_argument("files", nargs="+", help=".rejuice files to process")
+    b.add_argument("--spec", help="JSON recolor spec ({'colors': {...}, 'rules': [...]})")
+    b.add_argument("--set", action="append", type=parse_set, metavar="NAME[:FIELD]=COLOR",
+                   help="recolor one palette (repeatable); COLOR is #rrggbb or 0xaarrggbb")
+    b.add_argument("--dry-run", action="store_true", help="report changes, write nothing")
+    b.add_argument("--no-backup", action="store_true", help="skip the .bak copy")
+    b.add_argument("--in-place", action="store_true",
+                   help="patch only the changed bytes instead of an atomic rewrite")
+    b.add_argument("--no-index", action="store_true",
+                   help="ignore and do not write .idx parse caches")
+    b.add_argument("-j", "--jobs", type=int, default=None, help="worker processes")
+    k = sub.add_parser("backups", help="list or restore saved backup generations")
+    k.add_argument("file", help=".rejuice file")
+    k.add_argument("--restore", type=int, metavar="GEN", help="write generation GEN back")
+    d = sub.add_parser("diff", help="compare two .rejuice files by palette name")
+    d.add_argument("a"); d.add_argument("b")
+    d.add_argument("--json", action="store_true", help="machine-readable report")
+    d.add_argument("--no-index", action="store_true", help="ignore .idx parse caches")
+    m = sub.add_parser("merge", help="three-way merge of palette values")
+    m.add_argument("base", help="common ancestor")
+    m.add_argument("ours", help="file to merge into")
+    m.add_argument("theirs", help="file whose changes are taken")
+    m.add_argument("-o", "--output", help="write the result here instead of over OURS")
+    m.add_argument("--prefer", choices=("ours", "theirs"), help="resolve conflicts this way")
+    m.add_argument("--json", action="store_true", help="machine-readable report")
+    m.add_argument("--dry-run", action="store_true", help="report the merge, write nothing")
+    m.add_argument("--no-backup", action="store_true", help="skip the .bak copy")
+    m.add_argument("--no-index", action="store_true", help="ignore .idx parse caches")
+    x = sub.add_parser("export", help="write every color to CSV or JSON Lines")
+    x.add_argument("file", help=".rejuice file")
+    x.add_argument("-o", "--output", help="output file (default: stdout)")
+    x.add_argument("--format", choices=("csv", "jsonl"),
+                   help="default: from the output extension, else csv")
+    i = sub.add_parser("import", help="apply CSV / JSON Lines colors to a .rejuice file")
+    i.add_argument("file", help=".rejuice file to write")
+    i.add_argument("rows", help="CSV or JSON Lines with name, [occurrence], [field], color")
+    i.add_argument("--format", choices=("csv", "jsonl"),
+                   help="default: from the rows extension, else csv")
+    i.add_argument("--dry-run", action="store_true", help="validate and report, write nothing")
+    i.add_argument("--no-backup", action="store_true", help="skip the .bak copy")
+    i.add_argument("--in-place", action="store_true",
+                   help="patch only the changed bytes instead of an atomic rewrite")
+    i.add_argument("--no-index", action="store_true", help="ignore .idx parse caches")
+    return ap
+
+
+def main(argv=None, gui=None):
+    """
+    Run a subcommand, or without one the GUI: gui(args) imports it and returns
+    a callable that runs it to completion. Returns the exit code.
+    """
+    ap   = build_parser()
+    args = ap.parse_args(argv)
+    if args.profile_out:
+        args.profile = True
+    if args.command is not None:
+        run = lambda: COMMANDS[args.command](args)
+    elif gui is not None:
+        run = gui(args)             # loaded before instrument() so it can be wrapped
+    else:
+        ap.error("a command is required")
+    if args.profile:
+        instrument()
+    prof = None
+    if args.cprofile:
+        import cProfile
+        prof = cProfile.Profile(); prof.enable()
+    try:
+        return run()
+    finally:
+        if prof is not None:
+            prof.disable(); prof.dump_stats(args.cprofile)
+        if args.profile:
+            PROFILER.dump(args.profile_out or "afop_profile.json")
@@ -0,0 +1,175 @@
+"""
+Diff and three-way merge of palette files, joined by palette name, and the
+diff / merge commands.
+"""
+
+import json, shutil, sys
+
+from .rejuice import FIELDS, hex_or_none
+from .store import INDEX_ENABLED, PaletteStore, save_rejuice
+
+
+def palette_keys(store):
+    """{(name, occurrence): entry index}; repeated names are told apart by order."""
+    seen, out = {}, {}
+    for i in range(len(store)):
+        name = store.name(i)
+        n = seen.get(name, 0); seen[name] = n + 1
+        out[(name, n)] = i
+    return out
+
+
+def diff_stores(a, b):
+    """
+    Join two stores by palette key (hash maps, one pass each) and compare
+    current values. Returns
+      added    – [(key, index in b)]          entries only in b
+      removed  – [(key, index in a)]          entries only in a
+      changed  – [(key, ia, ib, field index, old, new)]   ARGB, None for "—"
+    """
+    ka, kb = palette_keys(a), palette_keys(b)
+    added   = [(k, ib) for k, ib in kb.items() if k not in ka]
+    removed = [(k, ia) for k, ia in ka.items() if k not in kb]
+    changed = []
+    for k, ia in ka.items():
+        ib = kb.get(k)
+        if ib is None:
+            continue
+        for fi in range(3):
+            old, new = a.value(ia, fi), b.value(ib, fi)
+            if old != new:
+                changed.append((k, ia, ib, fi, old, new))
+    return {"added": added, "removed": removed, "changed": changed}
+
+
+def merge_stores(base, ours, theirs, prefer=None):
+    """
+    Three-way merge of theirs into ours (as edits; save ours to write them in
+    one patch pass). A value theirs changed relative to base is taken when ours
+    kept the base value; when both changed it differently it is a conflict,
+    resolved only if prefer is "ours" or "theirs". Adding or removing entries
+    or fields cannot be expressed as value patches, so those are skipped.
+    Returns
+      applied    – [(key, field index, old, new)]
+      conflicts  – [(key, field index, base, ours, theirs, resolution or None)]
+      skipped    – [(key, field index or None, reason)]
+    """
+    kb, ko, kt = palette_keys(base), palette_keys(ours), palette_keys(theirs)
+    applied, conflicts, skipped = [], [], []
+    for key, it in kt.items():
+        io, ib = ko.get(key), kb.get(key)
+        if io is None:
+            skipped.append((key, None, "removed in ours" if ib is not None
+                                       else "entry added in theirs"))
+            continue
+        for fi in range(3):
+            t, o = theirs.value(it, fi), ours.value(io, fi)
+            b = base.value(ib, fi) if ib is not None else None
+            if t == o or t == b:
+                continue
+            take = o == b
+            if not take:
+                res = prefer if prefer in ("ours", "theirs") else None
+                conflicts.append((key, fi, b, o, t, res))
+                take = res == "theirs"
+            if not take:
+                continue
+            if o is None or t is None:
+                skipped.append((key, fi, "field removed in theirs" if t is None
+                                         else "field missing in ours"))
+                continue
+            ours.set(io, fi, t)
+            applied.append((key, fi, o, t))
+    skipped += [(key, None, "entry removed in theirs")
+                for key in ko if key in kb and key not in kt]
+    return {"applied": applied, "conflicts": conflicts, "skipped": skipped}
+
+
+def key_label(key):
+    """Display name of a palette key; repeats get #2, #3, …"""
+    name, n = key
+    return f"{name}#{n + 1}" if n else name
+
+
+def diff_report(diff):
+    """diff_stores() result as plain JSON-able data."""
+    key = lambda k: {"name": k[0], "occurrence": k[1]}
+    return {
+        "added":   [key(k) for k, _ in diff["added"]],
+        "removed": [key(k) for k, _ in diff["removed"]],
+        "changed": [dict(key(k), field=FIELDS[fi], old=hex_or_none(old), new=hex_or_none(new))
+                    for k, _, _, fi, old, new in diff["changed"]],
+    }
+
+
+def merge_report(merge):
+    """merge_stores() result as plain JSON-able data."""
+    key   = lambda k: {"name": k[0], "occurrence": k[1]}
+    field = lambda fi: None if fi is None else FIELDS[fi]
+    return {
+        "applied":   [dict(key(k), field=FIELDS[fi], old=hex_or_none(o), new=hex_or_none(n))
+                      for k, fi, o, n in merge["applied"]],
+        "conflicts": [dict(key(k), field=FIELDS[fi], base=hex_or_none(b), ours=hex_or_none(o),
+                           theirs=hex_or_none(t), resolution=r)
+                      for k, fi, b, o, t, r in merge["conflicts"]],
+        "skipped":   [dict(key(k), field=field(fi), reason=why)
+                      for k, fi, why in merge["skipped"]],
+    }
+
+
+def run_diff(args):
+    try:
+        a = PaletteStore.load(args.a, use_index=not args.no_index and INDEX_ENABLED)
+        b = PaletteStore.load(args.b, use_index=not args.no_index and INDEX_ENABLED)
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    diff = diff_stores(a, b)
+    if args.json:
+        print(json.dumps(diff_report(diff), indent=2))
+    else:
+        for key, _ in diff["removed"]:
+            print(f"-  {key_label(key)}")
+        for key, _ in diff["added"]:
+            print(f"+  {key_label(key)}")
+        for key, _, _, fi, old, new in diff["changed"]:
+            print(f"~  {key_label(key)}  {FIELDS[fi]}  {hex_or_none(old) or '—'} -> "
+                  f"{hex_or_none(new) or '—'}")
+        print(f"{len(diff['changed'])} changed, {len(diff['added'])} added, "
+              f"{len(diff['removed'])} removed", file=sys.stderr)
+    return 1 if any(diff.values()) else 0
+
+
+def run_merge(args):
+    use_index = not args.no_index and INDEX_ENABLED
+    try:
+        base, ours, theirs = (PaletteStore.load(p, use_index=use_index)
+                              for p in (args.base, args.ours, args.theirs))
+        merge = merge_stores(base, ours, theirs, args.prefer)
+        out = args.output or args.ours
+        if out != args.ours and not args.dry_run:
+            shutil.copyfile(args.ours, out)         # OUT exists even when nothing merged
+        if ours.edits and not args.dry_run:
+            save_rejuice(out, ours, backup=out == args.ours and not args.no_backup,
+                         use_index=use_index)
+            if ours.edits:
+                raise IOError(f"{len(ours.edits)} value(s) not found in {args.ours}")
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if args.json:
+        print(json.dumps(merge_report(merge), indent=2))
+    else:
+        for key, fi, old, new in merge["applied"]:
+            print(f"ok        {key_label(key)}  {FIELDS[fi]}  {hex_or_none(old)} -> {hex_or_none(new)}")
+        for key, fi, b, o, t, res in merge["conflicts"]:
+            print(f"CONFLICT  {key_label(key)}  {FIELDS[fi]}  base {hex_or_none(b) or '—'}  "
+                  f"ours {hex_or_none(o) or '—'}  theirs {hex_or_none(t) or '—'}"
+                  + (f"  -> {res}" if res else ""))
+        for key, fi, why in merge["skipped"]:
+            print(f"skipped   {key_label(key)}" + (f"  {FIELDS[fi]}" if fi is not None else "")
+                  + f"  ({why})")
+        note = "  (dry run)" if args.dry_run else ""
+        print(f"{len(merge['applied'])} applied, {len(merge['conflicts'])} conflicts, "
+              f"{len(merge['skipped'])} skipped{note}", file=sys.stderr)
+    return 1 if any(r is None for *_, r in merge["conflicts"]) else 0
@@ -0,0 +1,37 @@
+"""
+File helpers shared by the parser, store, backups and the change watcher.
+"""
+
+import hashlib, mmap, os
+from contextlib import contextmanager
+
+
+def file_state(path):
+    """(size, mtime_ns) of path – what a cache or backup is bound to."""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+@contextmanager
+def mapped(path):
+    """
+    ((size, mtime_ns), buf) for path, buf being a read-only mmap of it (b""
+    for an empty file). The state is taken from the open file, so it belongs
+    to the same inode the buffer shows even if path is replaced meanwhile.
+    """
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        state = st.st_size, st.st_mtime_ns
+        if not st.st_size:
+            yield state, b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield state, buf
+
+
+def sample_hash(buf):
+    """blake2b of the head, middle and tail 64 KiB of buf – cheap on any size."""
+    size, h = len(buf), hashlib.blake2b(digest_size=16)
+    for pos in sorted({0, max(0, size//2 - 32768), max(0, size - 65536)}):
+        h.update(buf[pos:pos + 65536])
+    return h.digest()
@@ -0,0 +1,115 @@
+"""
+Opt-in timing instrumentation for the hot paths.
+"""
+
+import functools, json, sys, threading, time
+from collections import deque
+
+# Hot paths timed when profiling is on, as "module:qualified name". Wrappers
+# are only installed by instrument(), so a normal run pays nothing.
+PROFILE_TARGETS = (
+    "afop_core.rejuice:parse_rejuice", "afop_core.store:save_rejuice",
+    "afop_core.rejuice:write_patches", "afop_core.workers:load_worker",
+    "afop_core.store:PaletteStore.load", "afop_core.search:ColorIndex.query",
+    "afop_core.watch:reparse_changed",
+    "afop_gui:ColorPicker._redraw_sq", "afop_gui:ColorPicker._redraw_hue",
+    "afop_gui:ColorTable._redraw", "afop_gui:ColorTable._render_window",
+    "afop_gui:ColorTable._render_tiles", "afop_gui:App._filter",
+)
+
+
+class Profiler:
+    """
+    In-process timing registry: per name a call count, total and last duration,
+    plus the most recent KEEP samples for percentiles. Thread-safe, since saves
+    and loads run on worker threads.
+    """
+
+    KEEP = 4096
+
+    def __init__(self):
+        self.enabled = False
+        self._lock   = threading.Lock()
+        self._stats  = {}       # name -> [count, total_s, last_s, deque of samples]
+
+    def record(self, name, dt):
+        with self._lock:
+            st = self._stats.get(name)
+            if st is None:
+                st = self._stats[name] = [0, 0.0, 0.0, deque(maxlen=self.KEEP)]
+            st[0] += 1; st[1] += dt; st[2] = dt
+            st[3].append(dt)
+
+    def wrap(self, fn, name):
+        @functools.wraps(fn)
+        def timed(*a, **kw):
+            t = time.perf_counter()
+            try:
+                return fn(*a, **kw)
+            finally:
+                self.record(name, time.perf_counter() - t)
+        timed._afop_timed = True
+        return timed
+
+    def last(self):
+        """{name: last duration in ms}"""
+        with self._lock:
+            return {k: st[2] * 1e3 for k, st in self._stats.items()}
+
+    def summary(self):
+        """{name: {count, total_ms, last_ms, mean_ms, p50_ms, p90_ms, p99_ms, max_ms}}"""
+        with self._lock:
+            snap = {k: (st[0], st[1], st[2], sorted(st[3])) for k, st in self._stats.items()}
+        out = {}
+        for k, (n, total, last, xs) in sorted(snap.items()):
+            pct = lambda q: xs[int(q * (len(xs) - 1))] * 1e3
+            out[k] = {"count": n, "total_ms": total * 1e3, "last_ms": last * 1e3,
+                      "mean_ms": total / n * 1e3, "p50_ms": pct(0.5),
+                      "p90_ms": pct(0.9), "p99_ms": pct(0.99), "max_ms": xs[-1] * 1e3}
+        return out
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+PROFILER = Profiler()
+
+
+def instrument(targets=PROFILE_TARGETS, profiler=None):
+    """
+    Swap each target for a timed wrapper, recorded under its qualified name.
+    Functions are replaced in every loaded afop module that imported them;
+    targets in modules that are not loaded (the GUI in batch runs) are skipped.
+    """
+    profiler = profiler or PROFILER
+    for target in targets:
+        modname, _, qual = target.partition(":")
+        mod = sys.modules.get(modname)
+        if mod is None:
+            continue
+        owner, _, attr = qual.rpartition(".")
+        if owner:
+            cls = getattr(mod, owner)
+            raw = cls.__dict__[attr]
+            if isinstance(raw, classmethod):
+                if not getattr(raw.__func__, "_afop_timed", False):
+                    setattr(cls, attr, classmethod(profiler.wrap(raw.__func__, qual)))
+            elif not getattr(raw, "_afop_timed", False):
+                setattr(cls, attr, profiler.wrap(raw, qual))
+            continue
+        fn = getattr(mod, attr)
+        if getattr(fn, "_afop_timed", False):
+            continue
+        timed = profiler.wrap(fn, qual)
+        for name, m in list(sys.modules.items()):
+            if m is not None and name.startswith("afop"):
+                for k, v in list(vars(m).items()):
+                    if v is fn:
+                        setattr(m, k, timed)
+    profiler.enabled = True
+    return profiler
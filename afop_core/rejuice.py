@@ -0,0 +1,226 @@
+"""
+Reading and patching the .rejuice token format, plus color-string helpers.
+"""
+
+import mmap, os, re, shutil, tempfile
+
+from .fileutil import mapped
+
+FIELDS = ("myPrimaryColor","mySecondaryColor","myTertiaryColor")
+MARKER = "GearCamoColorPalette"
+
+
+# Bytes str.strip() treats as whitespace once decoded as latin-1
+_BLANK    = bytes(c for c in range(256) if chr(c).isspace())
+_BL       = b"".join(b"\\x%02x" % c for c in _BLANK)
+_MARKER_B = MARKER.encode("latin-1")
+_FIELDS_B = {f.encode("latin-1"): f for f in FIELDS}
+# A marker or field name standing as a whole NUL-delimited token, followed by
+# the next non-blank token (its name / value) when there is one.
+_FIRST_RE = re.compile(rb"(?<![^\x00])" + re.escape(_MARKER_B) + rb"(?![^\x00])")
+_KEY_RE   = re.compile(rb"(?<![^\x00])(" +
+                       b"|".join(re.escape(k) for k in (_MARKER_B, *_FIELDS_B)) +
+                       rb")(?![^\x00])"
+                       rb"(?:\x00(?:[" + _BL + rb"]*\x00)*"
+                       rb"([^\x00]*[^\x00" + _BL + rb"][^\x00]*))?")
+
+
+def iter_rejuice(path):
+    """
+    Yield GearCamoColorPalette entries one at a time from a memory-mapped file.
+    The regex engine walks marker/field tokens together with the token that
+    follows them, so only names and color values are copied out and decoded.
+    Each entry also records where it lives in the file:
+      "_block"   – (start, end) byte range of the palette block
+      "_offsets" – {field: offset} of each color value (its length is len(value))
+    so save_rejuice can patch values in place without searching.
+    """
+    with mapped(path) as (state, buf):
+        yield from scan_entries(buf, 0, state[0])
+
+
+def scan_entries(buf, pos, end):
+    """
+    Yield the entries of buf[pos:end] like iter_rejuice, with offsets into
+    the whole of buf. end must be a block boundary (the start of a marker
+    token or the end of buf); the last block found ends there.
+    """
+    first = _FIRST_RE.search(buf, pos, end)
+    if first is None:
+        return
+    entry, start = None, 0
+    for m in _KEY_RE.finditer(buf, first.start(), end):
+        key, val = m.group(1, 2)
+        if key == _MARKER_B:
+            if entry is not None:
+                entry["_block"] = (start, m.start())
+                yield entry
+                entry = None
+            if val is None:
+                break
+            entry = {"name": val.decode("latin-1"),
+                     "myPrimaryColor": None,
+                     "mySecondaryColor": None,
+                     "myTertiaryColor": None,
+                     "_offsets": {}}
+            start = m.start()
+        elif val is not None:
+            field = _FIELDS_B[key]
+            entry[field] = val.decode("latin-1")
+            entry["_offsets"][field] = m.start(2)
+    if entry is not None:
+        entry["_block"] = (start, end)
+        yield entry
+
+
+def parse_rejuice(path):
+    return list(iter_rejuice(path))
+
+
+def hex_str_to_rgb(val):
+    if not val or not val.startswith("0x"):
+        return None, None
+    n = int(val, 16)
+    return f"#{(n>>16)&0xFF:02x}{(n>>8)&0xFF:02x}{n&0xFF:02x}", (n>>24)&0xFF
+
+
+def rgb_to_hex_str(html, alpha):
+    r,g,b = int(html[1:3],16), int(html[3:5],16), int(html[5:7],16)
+    return f"0x{(alpha<<24|r<<16|g<<8|b):08x}"
+
+
+def html_rgb(html):
+    return int(html[1:3],16), int(html[3:5],16), int(html[5:7],16)
+
+
+def hex_or_none(v):
+    """'0xaarrggbb' of an ARGB int, None for None (a "—" slot)."""
+    return None if v is None else f"0x{v:08x}"
+
+
+def parse_argb(val):
+    """ARGB int of a '0x…' color value, or None if it is not a 32-bit hex value."""
+    if not val or not val.startswith("0x") or len(val) > 255:
+        return None
+    try:
+        n = int(val, 16)
+    except ValueError:
+        return None
+    return n if n <= 0xFFFFFFFF else None
+
+
+def find_value(data, name, field):
+    """Slow path: (offset, bytes) of a field's value token, searched by palette name."""
+    # Locate this palette block by its exact name so we never touch other entries
+    marker = (MARKER + "\x00" + name + "\x00").encode("latin-1")
+    block_start = data.find(marker)
+    if block_start == -1:
+        return None
+    # Block ends at start of the next palette entry (or EOF)
+    block_end = data.find((MARKER + "\x00").encode("latin-1"), block_start + len(marker))
+    if block_end == -1:
+        block_end = len(data)
+    key = (field + "\x00").encode("latin-1")
+    pos = data.find(key, block_start, block_end)
+    if pos == -1:
+        return None
+    pos += len(key)
+    end = data.find(b"\x00", pos)
+    return pos, bytes(data[pos:end if end != -1 else len(data)])
+
+
+def apply_patches(data, patches):
+    """
+    Apply (offset, old_bytes, new_bytes, ...) patches back to front so a
+    length change never shifts a pending offset.
+    """
+    for pos, old_bytes, new_bytes, *_ in sorted(patches, key=lambda p: p[0], reverse=True):
+        data[pos:pos + len(old_bytes)] = new_bytes
+
+
+def atomic_write(path, data):
+    """
+    Replace path with data crash-safely: write a temp file in the same
+    directory, fsync it, then os.replace it over the target. A crash leaves
+    either the old file or the new one, never a truncated mix.
+    """
+    _replace(_write_temp(path, (data,)), path)
+
+
+def _write_temp(path, chunks):
+    """Write the byte chunks to a fsynced temp file next to path; returns its name."""
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=os.path.basename(path) + ".",
+                               suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        try: os.unlink(tmp)
+        except OSError: pass
+        raise
+    return tmp
+
+
+def _replace(tmp, path):
+    """Move the temp file tmp over path, keeping path's mode, and persist the rename."""
+    folder = os.path.dirname(os.path.abspath(path))
+    try:
+        if os.path.exists(path):
+            shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        try: os.unlink(tmp)
+        except OSError: pass
+        raise
+    if hasattr(os, "O_DIRECTORY"):           # persist the rename itself (POSIX)
+        dfd = os.open(folder, os.O_RDONLY | os.O_DIRECTORY)
+        try: os.fsync(dfd)
+        finally: os.close(dfd)
+
+
+def _spliced(view, patches):
+    """The chunks of view with patches applied: unchanged runs as zero-copy slices."""
+    prev = 0
+    for pos, old, new, *_ in sorted(patches, key=lambda p: p[0]):
+        yield view[prev:pos]
+        yield new
+        prev = pos + len(old)
+    yield view[prev:]
+
+
+def write_patches(path, store, edits=None, in_place=False):
+    """
+    Write edits (default: all of store.edits) into path and return the
+    patches written; the store itself is left untouched.
+    in_place patches the changed bytes through a writable mmap instead of
+    rewriting the file. It is used only when every new value keeps its byte
+    width (always true for '0x%08x' values written over '0x%08x' values);
+    otherwise the whole file is rewritten atomically.
+    """
+    if edits is None:
+        edits = dict(store.edits)
+    if not edits:
+        return []
+    if in_place:
+        with open(path, "r+b") as f, mmap.mmap(f.fileno(), 0) as mm:
+            patches = store.patches(mm, edits)
+            if all(len(p[1]) == len(p[2]) for p in patches):
+                for pos, old, new, _ in patches:
+                    mm[pos:pos + len(new)] = new
+                mm.flush()
+                return patches
+    # stream the mapped file into the temp file, splicing the new values in, so
+    # memory stays flat; the map is closed before the rename (Windows needs that)
+    with mapped(path) as (_, buf), memoryview(buf) as view:
+        patches = store.patches(buf, edits)
+        tmp = _write_temp(path, _spliced(view, patches))
+    _replace(tmp, path)
+    return patches
+
+
+def luma(html):
+    return 0.299*int(html[1:3],16) + 0.587*int(html[3:5],16) + 0.114*int(html[5:7],16)
@@ -0,0 +1,106 @@
+"""
+Tk-free PPM renderers for picker gradients and table swatch bands.
+"""
+
+
+from ._lazy import numpy
+from .theme import COL_WIDTHS, ROW_H
+
+def _hue_factors(h):
+    """
+    For a fixed hue, colorsys.hsv_to_rgb(h, s, v) is v * (1 - s*k) per channel
+    with a channel-specific k. Returns (kr, kg, kb) using the same float
+    operations as colorsys so both renderers stay pixel-identical to it.
+    """
+    i = int(h*6.0); f = (h*6.0) - i; i = i % 6
+    p, q, t, v = 1.0, f, 1.0 - f, 0.0
+    return ((v,t,p), (q,v,p), (p,v,t), (p,q,v), (t,p,v), (v,p,q))[i]
+
+
+def sv_gradient_ppm(h, W, H):
+    """Binary PPM of the saturation (x) / value (y) plane for hue h."""
+    header = b"P6 %d %d 255\n" % (W, H)
+    k = _hue_factors(h)
+    np = numpy()
+    if np is not None:
+        s = np.arange(W) / (W - 1)
+        v = 1.0 - np.arange(H) / (H - 1)
+        px = np.empty((H, W, 3), dtype=np.uint8)
+        for ch, kc in enumerate(k):
+            px[:, :, ch] = (v[:, None] * (1.0 - s * kc)[None, :]) * 255
+        return header + px.tobytes()
+    cols = [[1.0 - (col / (W - 1)) * kc for kc in k] for col in range(W)]
+    out = bytearray(header)
+    for row in range(H):
+        v = 1.0 - row / (H - 1)
+        out += bytes([int(v*a*255) for c in cols for a in c])
+    return bytes(out)
+
+
+def hue_bar_ppm(W, H):
+    """Binary PPM of the full-saturation rainbow, hue 0 → 1 left to right."""
+    row = bytearray()
+    for col in range(W):
+        row += bytes([int((1.0 - k)*255) for k in _hue_factors(col / (W - 1))])
+    return b"P6 %d %d 255\n" % (W, H) + bytes(row) * H
+
+
+# Swatch atlas: a band of table rows rendered as one image (see ColorTable atlas)
+ATLAS_ROWS  = 24            # table rows per band image
+_ATLAS_BG   = (0x2a2a3e, 0x252538)     # even / odd row background
+_ATLAS_GRID = 0x3a3a52
+_ATLAS_PAD  = 6
+
+
+def _rgb3(c):
+    return (c >> 16) & 0xFF, (c >> 8) & 0xFF, c & 0xFF
+
+
+def atlas_row_tops(first, n):
+    """Pixel top of rows first..first+n (n+1 values), rounded from ROW_H."""
+    return [round(r * ROW_H) for r in range(first, first + n + 1)]
+
+
+def atlas_swatch_box(fi, top, bottom):
+    """Inner (x0, y0, x1, y1) of a swatch, exclusive end, in the row's pixels."""
+    x = sum(COL_WIDTHS[:fi + 1])
+    return (x + _ATLAS_PAD + 1, top + 5, x + COL_WIDTHS[fi + 1] - _ATLAS_PAD - 1, bottom - 5)
+
+
+def table_band_ppm(first, colors):
+    """
+    Binary PPM of table rows first.. (colors: per row a 3-tuple of RGB ints,
+    None for "—"): alternating row backgrounds, grid lines, and each swatch
+    as a black-outlined rectangle. Text is drawn separately on the canvas.
+    Each pixel row of a table row is one of four scanlines (grid, plain,
+    swatch edge, swatch fill), so the band is built by repeating byte strings
+    – measured ~4x faster than NumPy fancy-index fills at this size.
+    """
+    n, W = len(colors), sum(COL_WIDTHS)
+    tops = atlas_row_tops(first, n)
+    H    = tops[-1] - tops[0]
+    header = b"P6 %d %d 255\n" % (W, H)
+    grid = bytes(_rgb3(_ATLAS_GRID))
+    out  = bytearray(header)
+    for k, row in enumerate(colors):
+        h  = tops[k + 1] - tops[k]
+        bg = bytes(_rgb3(_ATLAS_BG[(first + k) % 2]))
+        edge, fill = bytearray(), bytearray()       # swatch border / interior lines
+        plain = bytearray()
+        x = 0
+        for ci, w in enumerate(COL_WIDTHS):
+            plain += grid + bg * (w - 1)
+            if ci == 0 or row[ci - 1] is None:
+                edge += grid + bg * (w - 1); fill += grid + bg * (w - 1)
+            else:
+                x0, _, x1, _ = atlas_swatch_box(ci - 1, 0, 0)
+                a, b = x0 - 1 - x, x1 + 1 - x       # outline span within the column
+                edge += grid + bg * (a - 1) + b"\0\0\0" * (b - a) + bg * (w - b)
+                fill += (grid + bg * (a - 1) + b"\0\0\0" + bytes(_rgb3(row[ci - 1])) * (b - a - 2)
+                         + b"\0\0\0" + bg * (w - b))
+            x += w
+        out += grid * W + plain * 3 + edge + fill * (h - 10) + edge + plain * 4
+    return bytes(out)
+
+
+HUE_STEPS = 360         # gradients are rendered (and cached) per 1° of hue
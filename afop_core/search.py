@@ -0,0 +1,223 @@
+"""
+Palette search: by name (trigram index) and by color (CIELAB distance).
+"""
+
+import heapq
+from array import array
+
+from ._lazy import numpy
+from .rejuice import html_rgb
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  NAME SEARCH
+# ══════════════════════════════════════════════════════════════════════════════
+
+class SearchIndex:
+    """
+    Case-insensitive substring search over palette names.
+    Names are lowercased once and every trigram maps to the (ascending) list
+    of entries containing it, so a query only verifies the entries listed
+    under its rarest trigram. A query that extends the previous one narrows
+    the previous result instead of starting over.
+    """
+
+    def __init__(self, names=()):
+        self.lowered = []
+        self.grams   = {}
+        self.add(names)
+
+    def add(self, names):
+        """Index more names; they get the next entry indices."""
+        for name in names:
+            i, name = len(self.lowered), name.lower()
+            self.lowered.append(name)
+            for g in {name[k:k+3] for k in range(len(name) - 2)}:
+                self.grams.setdefault(g, []).append(i)
+        self._last = ("", None)
+
+    def query(self, text):
+        """Indices of names containing text (already lowercased), ascending."""
+        if not text:
+            return list(range(len(self.lowered)))
+        prev, prev_hits = self._last
+        if prev and prev_hits is not None and prev in text:
+            pool = prev_hits
+        elif len(text) >= 3:
+            pool = min((self.grams.get(text[k:k+3], ()) for k in range(len(text) - 2)),
+                       key=len)
+        else:
+            pool = range(len(self.lowered))
+        low  = self.lowered
+        hits = [i for i in pool if text in low[i]]
+        self._last = (text, hits)
+        return hits
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  COLOR SIMILARITY SEARCH
+# ══════════════════════════════════════════════════════════════════════════════
+
+# sRGB byte -> linear light, shared by both paths
+_LINEAR = [c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+           for c in (i / 255.0 for i in range(256))]
+_XYZ_D65 = ((0.4124564 / 0.95047, 0.3575761 / 0.95047, 0.1804375 / 0.95047),
+            (0.2126729,           0.7151522,           0.0721750),
+            (0.0193339 / 1.08883, 0.1191920 / 1.08883, 0.9503041 / 1.08883))
+_LAB_E = (6 / 29) ** 3
+_LAB_K = 1 / (3 * (6 / 29) ** 2)
+
+
+def argb_to_lab(argb):
+    """CIELAB (D65) of the RGB part of one 0xAARRGGBB int."""
+    r, g, b = _LINEAR[(argb >> 16) & 0xFF], _LINEAR[(argb >> 8) & 0xFF], _LINEAR[argb & 0xFF]
+    fx, fy, fz = (t ** (1 / 3) if t > _LAB_E else t * _LAB_K + 4 / 29
+                  for t in (m[0]*r + m[1]*g + m[2]*b for m in _XYZ_D65))
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
+
+
+def _lab_np(argb):
+    """argb_to_lab over a uint32 array -> (n, 3) float64."""
+    np = numpy()
+    lin = np.asarray(_LINEAR)
+    rgb = np.stack([lin[(argb >> sh) & 0xFF] for sh in (16, 8, 0)], axis=1)
+    t   = rgb @ np.asarray(_XYZ_D65).T
+    f   = np.where(t > _LAB_E, np.cbrt(t), t * _LAB_K + 4 / 29)
+    return np.stack([116 * f[:, 1] - 16, 500 * (f[:, 0] - f[:, 1]),
+                     200 * (f[:, 1] - f[:, 2])], axis=1)
+
+
+class _KDTree:
+    """
+    Minimal 3-d tree for the pure-Python path. Nodes live in flat lists
+    (point index, split axis, left, right); -1 is "no child".
+    """
+
+    def __init__(self, points):
+        self.points = points
+        self.node, self.axis, self.left, self.right = [], [], [], []
+        self.root = self._build(list(range(len(points))), 0)
+
+    def _build(self, idx, depth):
+        if not idx:
+            return -1
+        ax  = depth % 3
+        idx.sort(key=lambda i: self.points[i][ax])
+        mid = len(idx) // 2
+        n   = len(self.node)
+        self.node.append(idx[mid]); self.axis.append(ax)
+        self.left.append(-1); self.right.append(-1)
+        self.left[n]  = self._build(idx[:mid], depth + 1)
+        self.right[n] = self._build(idx[mid+1:], depth + 1)
+        return n
+
+    def search(self, q, k=None, radius=None, accept=None):
+        """
+        [(squared distance, point index)] ascending: the k nearest (k=None:
+        all) within radius (None: unbounded). accept(i) filters points.
+        """
+        pts, best = self.points, []         # max-heap of (-d2, -i) when k is set
+        bound = radius * radius if radius is not None else float("inf")
+        stack = [self.root] if self.root >= 0 else []
+        while stack:
+            n = stack.pop()
+            i, ax = self.node[n], self.axis[n]
+            p = pts[i]
+            d2 = (p[0]-q[0])**2 + (p[1]-q[1])**2 + (p[2]-q[2])**2
+            if d2 <= bound and (accept is None or accept(i)):
+                if k is None:
+                    best.append((d2, i))
+                else:
+                    heapq.heappush(best, (-d2, -i))
+                    if len(best) > k:
+                        heapq.heappop(best)
+                    if len(best) == k:
+                        bound = min(bound, -best[0][0])
+            diff = q[ax] - p[ax]
+            near, far = (self.left[n], self.right[n]) if diff < 0 else (self.right[n], self.left[n])
+            if far >= 0 and diff * diff <= bound:
+                stack.append(far)
+            if near >= 0:
+                stack.append(near)
+        if k is not None:
+            best = [(-d, -i) for d, i in best]
+        return sorted(best)
+
+
+class ColorIndex:
+    """
+    Perceptual nearest-color search over every present color slot of a
+    PaletteStore, by CIE76 ΔE (Euclidean distance in CIELAB). With NumPy all
+    distances are one vectorized pass; without it a KD-tree answers radius
+    and k-nearest queries. The index covers the saved colors and is rebuilt
+    when they change; pending edits are checked on top at query time.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._base = None
+
+    def _sync(self):
+        st = self.store
+        if self._base is not None and self._base == st.colors:
+            return
+        self._base = array("I", st.colors)
+        np = numpy()
+        if np is not None:
+            colors   = np.frombuffer(self._base, dtype=np.uint32)
+            self._lab = _lab_np(colors)
+            self._present = np.frombuffer(bytes(st.widths), dtype=np.uint8) != 0
+        else:
+            self._slots = [s for s in range(len(st.widths)) if st.widths[s]]
+            self._tree  = _KDTree([argb_to_lab(self._base[s]) for s in self._slots])
+
+    def query(self, color, threshold=None, k=None, fields=(0, 1, 2)):
+        """
+        [(ΔE, entry_idx, field_idx)] ascending for slots in fields: all within
+        threshold ΔE, or the k nearest (within threshold if both are given).
+        color is '#rrggbb' or an ARGB int.
+        """
+        if isinstance(color, str):
+            r, g, b = html_rgb(color); color = r << 16 | g << 8 | b
+        self._sync()
+        st, q, fields = self.store, argb_to_lab(color), set(fields)
+        edits, np = st.edits, numpy()
+        if np is not None:
+            d2 = ((self._lab - q) ** 2).sum(axis=1)
+            ok = self._present.copy()
+            for fi in {0, 1, 2} - fields:
+                ok[fi::3] = False
+            if edits:
+                slots = np.fromiter(edits, dtype=np.int64, count=len(edits))
+                d2[slots] = ((_lab_np(np.fromiter(edits.values(), dtype=np.uint32,
+                                                  count=len(edits))) - q) ** 2).sum(axis=1)
+            if threshold is not None:
+                ok &= d2 <= threshold * threshold
+            cand = np.flatnonzero(ok)
+            order = cand[np.lexsort((cand, d2[cand]))]
+            if k is not None:
+                order = order[:k]
+            hits = zip(d2[order].tolist(), order.tolist())
+        else:
+            slots = self._slots
+            hits  = self._tree.search(
+                q, k, threshold,
+                lambda i: slots[i] % 3 in fields and slots[i] not in edits)
+            hits  = [(d2, slots[i]) for d2, i in hits]
+            bound = threshold * threshold if threshold is not None else float("inf")
+            for slot, v in edits.items():
+                if slot % 3 in fields:
+                    p  = argb_to_lab(v)
+                    d2 = (p[0]-q[0])**2 + (p[1]-q[1])**2 + (p[2]-q[2])**2
+                    if d2 <= bound:
+                        hits.append((d2, slot))
+            hits.sort()
+            if k is not None:
+                hits = hits[:k]
+        return [(d2 ** 0.5, slot // 3, slot % 3) for d2, slot in hits]
+
+    def entries(self, color, threshold=None, k=None, fields=(0, 1, 2)):
+        """Entry indices with a matching slot, nearest first (k counts slots)."""
+        seen = {}
+        for _, i, _ in self.query(color, threshold, k, fields):
+            seen.setdefault(i, None)
+        return list(seen)
@@ -0,0 +1,290 @@
+"""
+Columnar palette storage and its .idx parse-cache sidecar.
+"""
+
+import os, struct, sys, threading
+from array import array
+from bisect import bisect_left
+
+from .rejuice import atomic_write, FIELDS, find_value, iter_rejuice, parse_argb, write_patches
+from .backups import BackupLog
+from .fileutil import file_state, mapped, sample_hash
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  PALETTE STORE
+# ══════════════════════════════════════════════════════════════════════════════
+
+class NameTable:
+    """
+    Interned palette names: each distinct name is stored once and used by id.
+    Safe to share between stores loading on different threads; a name that
+    is already known is looked up without taking the lock.
+    """
+
+    def __init__(self):
+        self.names = []
+        self._ids  = {}
+        self._lock = threading.Lock()
+
+    def intern(self, name):
+        i = self._ids.get(name)
+        if i is None:
+            with self._lock:
+                i = self._ids.get(name)
+                if i is None:
+                    self.names.append(sys.intern(name))
+                    i = self._ids[name] = len(self.names) - 1
+        return i
+
+
+class PaletteStore:
+    """
+    Columnar storage for the palettes of one file. Entry i owns the three
+    color slots i*3 + field index:
+      name_ids – array('I') ids into a NameTable (shareable between stores)
+      colors   – array('I') original ARGB per slot
+      widths   – bytearray, byte length of the slot's value text in the file;
+                 0 marks a "—" slot (every 32-bit value is a legal ARGB, so
+                 the width doubles as the missing-value sentinel)
+      offsets  – array('q') byte offset of the slot's value text, -1 if unknown
+      blocks   – array('q') start, end of each palette block
+      edits    – {slot: ARGB}, a copy-on-write overlay holding unsaved changes
+    About 60 bytes per entry, and the original/edited split costs nothing
+    until something is edited.
+    """
+
+    def __init__(self, names=None):
+        self.names    = names if names is not None else NameTable()
+        self.name_ids = array("I")
+        self.colors   = array("I")
+        self.widths   = bytearray()
+        self.offsets  = array("q")
+        self.blocks   = array("q")
+        self.edits    = {}
+
+    @classmethod
+    def load(cls, path, names=None, use_index=None):
+        """Parse path, or read its .idx sidecar when that is still valid."""
+        if use_index is None:
+            use_index = INDEX_ENABLED
+        store = read_index(path, names) if use_index else None
+        if store is None:
+            state = index_state(path) if use_index else None
+            store = cls(names)
+            for e in iter_rejuice(path):
+                store.append(e)
+            if use_index:
+                write_index(path, store, state)
+        return store
+
+    def append(self, entry):
+        """Add an entry dict as yielded by iter_rejuice."""
+        self.name_ids.append(self.names.intern(entry["name"]))
+        offsets = entry.get("_offsets", {})
+        for field in FIELDS:
+            val = entry[field]
+            n   = parse_argb(val)
+            self.colors.append(n or 0)
+            self.widths.append(len(val) if n is not None else 0)
+            self.offsets.append(offsets.get(field, -1) if n is not None else -1)
+        self.blocks.extend(entry.get("_block", (-1, -1)))
+
+    def __len__(self):
+        return len(self.name_ids)
+
+    def copy(self, edits=None):
+        """
+        Copy of the columns sharing the NameTable, with edits (default: a copy
+        of self.edits); committing to it leaves self untouched.
+        """
+        new = PaletteStore(self.names)
+        new.name_ids = self.name_ids[:]
+        new.colors   = self.colors[:]
+        new.widths   = self.widths[:]
+        new.offsets  = self.offsets[:]
+        new.blocks   = self.blocks[:]
+        new.edits    = dict(self.edits if edits is None else edits)
+        return new
+
+    def name(self, i):
+        return self.names.names[self.name_ids[i]]
+
+    def has(self, i, fi):
+        return self.widths[i*3 + fi] != 0
+
+    def value(self, i, fi):
+        """Current ARGB of a slot (edits included), None for a "—" slot."""
+        slot = i*3 + fi
+        if not self.widths[slot]:
+            return None
+        return self.edits.get(slot, self.colors[slot])
+
+    def original(self, i, fi):
+        """ARGB of a slot as it is in the file, None for a "—" slot."""
+        slot = i*3 + fi
+        return self.colors[slot] if self.widths[slot] else None
+
+    def text(self, i, fi):
+        """Current value as written to the file ('0xaarrggbb'), None for "—"."""
+        v = self.value(i, fi)
+        return None if v is None else f"0x{v:08x}"
+
+    def set(self, i, fi, argb):
+        slot = i*3 + fi
+        if not 0 <= argb <= 0xFFFFFFFF:
+            raise ValueError(f"{argb!r} is not a 32-bit ARGB value")
+        if not self.widths[slot]:
+            raise ValueError(f"{self.name(i)} has no {FIELDS[fi]} to edit")
+        if argb == self.colors[slot]:
+            self.edits.pop(slot, None)
+        else:
+            self.edits[slot] = argb
+
+    @property
+    def dirty(self):
+        return bool(self.edits)
+
+    def patches(self, data, edits=None):
+        """
+        [(offset, old_bytes, new_bytes, slot)] for every edited slot (of edits,
+        default self.edits). The bytes at the recorded offset must still hold
+        the original value; otherwise the value is searched for by palette
+        name. Slots found nowhere are left out (and stay in self.edits).
+        """
+        out = []
+        for slot, argb in sorted((self.edits if edits is None else edits).items()):
+            pos, w = self.offsets[slot], self.widths[slot]
+            old = bytes(data[pos:pos + w]) if pos >= 0 else b""
+            if (pos < 0 or data[pos + w:pos + w + 1] not in (b"\x00", b"")
+                    or parse_argb(old.decode("latin-1")) != self.colors[slot]):
+                found = find_value(data, self.name(slot // 3), FIELDS[slot % 3])
+                if found is None or parse_argb(found[1].decode("latin-1")) != self.colors[slot]:
+                    continue
+                pos, old = found
+            out.append((pos, old, f"0x{argb:08x}".encode("latin-1"), slot))
+        return out
+
+    def commit(self, patches):
+        """
+        Fold what patches wrote into the originals. An edit made after the
+        patches were computed (during a background save) stays pending.
+        """
+        shifts = sorted((p[0], len(p[2]) - len(p[1])) for p in patches
+                        if len(p[2]) != len(p[1]))
+        for pos, old, new, slot in patches:
+            written = int(new, 16)
+            self.colors[slot]  = written
+            self.offsets[slot] = pos
+            self.widths[slot]  = len(new)
+            if self.edits.get(slot) == written:
+                del self.edits[slot]
+        if shifts:
+            # a value that changed length moves everything after it
+            starts, total, acc = [s[0] for s in shifts], [], 0
+            for _, d in shifts:
+                acc += d; total.append(acc)
+            def moved(off):
+                k = bisect_left(starts, off)
+                return off + total[k-1] if off >= 0 and k else off
+            self.offsets = array("q", map(moved, self.offsets))
+            self.blocks  = array("q", map(moved, self.blocks))
+
+
+def save_rejuice(path, store, edits=None, backup=True, in_place=False, use_index=True):
+    """
+    The one write path: log a backup generation of path, write edits (default:
+    all of store.edits) into it, commit them to store as its new originals and
+    refresh the .idx sidecar. Returns the patches written; edits that could
+    not be located in the file stay in store.edits, still unsaved.
+    """
+    backups = BackupLog(path) if backup else None
+    if backups: backups.prepare()
+    patches = write_patches(path, store, edits, in_place)
+    if backups: backups.record(patches)
+    store.commit(patches)
+    if use_index and INDEX_ENABLED:
+        write_index(path, store)
+    return patches
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  PARSE INDEX SIDECAR
+# ══════════════════════════════════════════════════════════════════════════════
+
+INDEX_SUFFIX  = ".idx"
+# set AFOP_NO_INDEX=1 (or pass --no-index) to always parse from scratch
+INDEX_ENABLED = os.environ.get("AFOP_NO_INDEX", "") in ("", "0")
+
+_IDX_MAGIC = b"AFOPIDX1"
+_IDX_HEAD  = struct.Struct("<QqI16s?Q")   # size, mtime_ns, entries, hash, little-endian, names len
+
+
+def index_state(path):
+    """(size, mtime_ns, sampled hash) of path – take it before parsing, for write_index."""
+    with mapped(path) as (state, buf):
+        return state + (sample_hash(buf),)
+
+
+def write_index(path, store, state=None):
+    """
+    Save the store's parse (as it is in the file – edits are not included)
+    to path + ".idx": a header binding it to the file's size, mtime and a
+    sampled content hash, then the names and the raw column arrays.
+    state is index_state(path) from before the parse; when the file has
+    changed since, the parse may not match it and nothing is written.
+    Without state the file is taken to match the store now (after a save).
+    Best effort – a read-only folder just means no cache.
+    """
+    try:
+        if state is None:
+            state = index_state(path)
+        elif file_state(path) != state[:2]:
+            return
+        size, mtime, digest = state
+        names = b"\x00".join(store.name(i).encode("latin-1") for i in range(len(store)))
+        atomic_write(path + INDEX_SUFFIX, b"".join((
+            _IDX_MAGIC,
+            _IDX_HEAD.pack(size, mtime, len(store), digest,
+                           sys.byteorder == "little", len(names)),
+            names, store.colors.tobytes(), bytes(store.widths),
+            store.offsets.tobytes(), store.blocks.tobytes())))
+    except OSError:
+        pass
+
+
+def read_index(path, names=None):
+    """
+    PaletteStore from path's sidecar in a single read, or None when there is
+    none or it no longer matches the file (a stale sidecar is deleted).
+    """
+    idx = path + INDEX_SUFFIX
+    try:
+        with open(idx, "rb") as f: raw = f.read()
+    except OSError:
+        return None
+    try:
+        if not raw.startswith(_IDX_MAGIC):
+            raise ValueError("not an index")
+        size, mtime, n, digest, little, nlen = _IDX_HEAD.unpack_from(raw, len(_IDX_MAGIC))
+        if ((size, mtime) != file_state(path) or little != (sys.byteorder == "little")
+                or (size, mtime, digest) != index_state(path)):
+            raise ValueError("stale index")
+        pos   = len(_IDX_MAGIC) + _IDX_HEAD.size
+        blob  = raw[pos:pos + nlen].decode("latin-1"); pos += nlen
+        store = PaletteStore(names)
+        store.name_ids = array("I", map(store.names.intern, blob.split("\x00"))
+                               if n else ())
+        store.colors.frombytes(raw[pos:pos + 3*n*store.colors.itemsize])
+        pos += 3*n*store.colors.itemsize
+        store.widths = bytearray(raw[pos:pos + 3*n]); pos += 3*n
+        store.offsets.frombytes(raw[pos:pos + 3*n*store.offsets.itemsize])
+        pos += 3*n*store.offsets.itemsize
+        store.blocks.frombytes(raw[pos:pos + 2*n*store.blocks.itemsize])
+        pos += 2*n*store.blocks.itemsize
+        if pos != len(raw) or len(store.name_ids) != n:
+            raise ValueError("truncated index")
+    except (OSError, ValueError, struct.error):
+        try: os.unlink(idx)
+        except OSError: pass
+        return None
+    return store
@@ -0,0 +1,167 @@
+"""
+Streaming CSV / JSON Lines export and import of palette colors.
+"""
+
+import csv, json, sys
+
+from .rejuice import FIELDS, hex_str_to_rgb, iter_rejuice, parse_argb
+from .store import INDEX_ENABLED, PaletteStore, save_rejuice
+from .batch import resolve_color
+
+ROW_KEYS = ("name", "occurrence", "field", "color")
+
+
+def export_rows(path):
+    """
+    Yield one row dict per present color value, streamed from the parser:
+      {"name", "occurrence" (0 for the first palette of that name), "field",
+       "color" ('0xaarrggbb')}
+    "—" slots are not exported.
+    """
+    seen = {}
+    for e in iter_rejuice(path):
+        name = e["name"]
+        n = seen.get(name, 0); seen[name] = n + 1
+        for field in FIELDS:
+            v = parse_argb(e[field])
+            if v is not None:
+                yield {"name": name, "occurrence": n, "field": field, "color": f"0x{v:08x}"}
+
+
+def write_rows(rows, out, fmt):
+    """Stream rows to the text file object out as "csv" or "jsonl"; returns the count."""
+    n = 0
+    if fmt == "csv":
+        w = csv.DictWriter(out, ROW_KEYS, lineterminator="\n")
+        w.writeheader()
+        for n, row in enumerate(rows, 1):
+            w.writerow(row)
+    else:
+        for n, row in enumerate(rows, 1):
+            out.write(json.dumps(row) + "\n")
+    return n
+
+
+def read_rows(f, fmt):
+    """
+    Yield (line number, row dict) from the text file object f. A JSON line that
+    is not an object yields (line, ValueError) instead of stopping the import.
+    """
+    if fmt == "csv":
+        r = csv.DictReader(f)
+        for row in r:
+            yield r.line_num, row
+        return
+    for line, text in enumerate(f, 1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+            if not isinstance(row, dict):
+                raise ValueError("not a JSON object")
+        except ValueError as e:
+            yield line, ValueError(f"bad JSON: {e}")
+            continue
+        yield line, row
+
+
+def _occurrence(occ):
+    """A row's occurrence as an int >= 0 (from an int or a digit string), else None."""
+    if isinstance(occ, str) and occ.isascii() and occ.strip().isdigit():
+        return int(occ)
+    if isinstance(occ, int) and not isinstance(occ, bool) and occ >= 0:
+        return occ
+    return None
+
+
+def import_rows(store, rows):
+    """
+    Apply (line, row) pairs to store as edits. color is '#rrggbb' (keeps the
+    slot's alpha) or '0xaarrggbb'; an empty field means all three and an
+    empty occurrence every palette of that name; otherwise occurrence counts
+    from 0. Later rows win.
+    Returns (changed values, [(line, problem)]) – unknown names, fields and
+    occurrences, malformed colors and "—" targets are all reported.
+    """
+    by_name = {}
+    for i in range(len(store)):
+        by_name.setdefault(store.name(i), []).append(i)
+    changed, problems = set(), []
+    for line, row in rows:
+        if isinstance(row, Exception):
+            problems.append((line, str(row))); continue
+        name, field, occ = row.get("name"), row.get("field"), row.get("occurrence")
+        if not isinstance(name, str):
+            problems.append((line, f"name must be text, got {name!r}")); continue
+        hits = by_name.get(name)
+        if hits is None:
+            problems.append((line, f"unknown palette {name!r}")); continue
+        if field in (None, ""):
+            field = None
+        elif not isinstance(field, str) or field not in FIELDS:
+            problems.append((line, f"{name}: unknown field {field!r}")); continue
+        if occ not in (None, ""):
+            n = _occurrence(occ)
+            if n is None or n >= len(hits):
+                problems.append((line, f"{name}: no occurrence {occ!r}")); continue
+            hits = [hits[n]]
+        color = row.get("color")
+        try:
+            resolve_color(color, 0)
+        except ValueError as e:
+            problems.append((line, f"{name}: {e}")); continue
+        fis = [FIELDS.index(field)] if field else range(3)
+        for i in hits:
+            for fi in fis:
+                html, alpha = hex_str_to_rgb(store.text(i, fi))
+                if html is None:
+                    problems.append((line, f"{name}: {FIELDS[fi]} is —, nothing to set"))
+                    continue
+                store.set(i, fi, int(resolve_color(color, alpha), 16))
+                changed.add(i*3 + fi)
+    return sum(1 for slot in changed if slot in store.edits), problems
+
+
+def _row_format(path, fmt):
+    if fmt:
+        return fmt
+    return "jsonl" if path and path.lower().endswith((".jsonl", ".json", ".ndjson")) else "csv"
+
+
+def run_export(args):
+    fmt = _row_format(args.output, args.format)
+    try:
+        out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+        try:
+            n = write_rows(export_rows(args.file), out, fmt)
+        finally:
+            if out is not sys.stdout: out.close()
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    print(f"{n} values exported", file=sys.stderr)
+    return 0
+
+
+def run_import(args):
+    fmt = _row_format(args.rows, args.format)
+    try:
+        store = PaletteStore.load(args.file, use_index=not args.no_index and INDEX_ENABLED)
+        with open(args.rows, newline="", encoding="utf-8-sig") as f:   # spreadsheets add a BOM
+            changed, problems = import_rows(store, read_rows(f, fmt))
+        if store.edits and not args.dry_run:
+            save_rejuice(args.file, store, backup=not args.no_backup,
+                         in_place=args.in_place, use_index=not args.no_index)
+            problems += [(None, f"{store.name(slot // 3)}: {FIELDS[slot % 3]} not found "
+                                "in the file, not written") for slot in sorted(store.edits)]
+    except (OSError, csv.Error) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    except UnicodeDecodeError as e:
+        print(f"error: {args.rows}: not UTF-8 text ({e})", file=sys.stderr)
+        return 2
+    for line, msg in problems:
+        print(f"{args.rows}:{line}: {msg}" if line else f"{args.file}: {msg}", file=sys.stderr)
+    note = " (dry run)" if args.dry_run else ""
+    print(f"{changed} values changed, {len(problems)} problems{note}", file=sys.stderr)
+    return 1 if problems else 0
@@ -0,0 +1,17 @@
+"""
+Colors and table geometry shared by the GUI and the renderers.
+"""
+
+BG      = "#1e1e2e"
+SURFACE = "#2a2a3e"
+OVERLAY = "#313244"
+TEXT    = "#cdd6f4"
+SUBTEXT = "#6c7086"
+MAUVE   = "#cba6f7"
+GREEN   = "#a6e3a1"
+BLUE    = "#89dceb"
+RED     = "#f38ba8"
+
+ROW_H      = 37.4
+COL_WIDTHS = [280, 210, 210, 210]
+HEADERS    = ("CamoColorPalette","myPrimaryColor","mySecondaryColor","myTertiaryColor")
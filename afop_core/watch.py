@@ -0,0 +1,145 @@
+"""
+Noticing outside changes to an open file and reparsing only what changed.
+"""
+
+import hashlib
+from bisect import bisect_left, bisect_right
+
+from .rejuice import MARKER, scan_entries
+from .fileutil import file_state, mapped, sample_hash
+from .store import PaletteStore
+
+CHUNK = 4096
+_MARKER_LEN = len(MARKER) + 1          # the marker token and the NUL after it
+
+
+def _chunk_digests(data, start, step):
+    h = hashlib.blake2b
+    return [h(data[max(0, p):p + CHUNK], digest_size=8).digest()
+            for p in range(start, -CHUNK if step < 0 else len(data), step)]
+
+
+class FileState:
+    """
+    Size, mtime and content hash of a file, plus blake2b digests of its
+    CHUNK-byte chunks counted from the start (fwd) and from the end (bwd),
+    so two states can tell how many bytes at each end they share. Built from
+    a buffer of the contents (e.g. the mmap a parse used) and the (size,
+    mtime_ns) it was opened with; only the digests are kept. index_state is
+    the matching state for write_index.
+    """
+
+    def __init__(self, path, buf, state):
+        self.path  = path
+        self.size  = len(buf)
+        self.mtime = state[1]
+        self.fwd   = _chunk_digests(buf, 0, CHUNK)
+        self.bwd   = _chunk_digests(buf, self.size - CHUNK, -CHUNK) if self.size else []
+        self.digest = hashlib.blake2b(b"".join(self.fwd), digest_size=16).digest()
+        self.index_state = (self.size, self.mtime, sample_hash(buf))
+
+    @classmethod
+    def capture(cls, path):
+        """FileState of path as it is now (reads the whole file – not on the GUI thread)."""
+        with mapped(path) as (state, buf):
+            return cls(path, buf, state)
+
+    def unchanged(self):
+        """True while size and mtime still match – a stat, no reading."""
+        try:
+            return file_state(self.path) == (self.size, self.mtime)
+        except OSError:
+            return True                 # gone or being replaced: look again later
+
+    def common(self, other):
+        """(prefix, suffix): byte counts at the start and end both states share."""
+        n = min(self.size, other.size)
+        p = 0
+        for a, b in zip(self.fwd, other.fwd):
+            if a != b: break
+            p += 1
+        q = 0
+        for a, b in zip(self.bwd, other.bwd):
+            if a != b: break
+            q += 1
+        p = min(p * CHUNK, n)
+        return p, min(q * CHUNK, n - p)
+
+
+def reparse_changed(store, old, new, data):
+    """
+    PaletteStore for data (a buffer of the contents new was built from), given store
+    parsed from the file when it matched old. Entries wholly inside the bytes
+    both states share are copied (shifted when the file grew or shrank); only
+    the blocks overlapping the changed range are parsed again. Edits are not
+    carried over (see carry_edits). Returns (store, span) where span =
+    (k0, k1, m1): old entries k0..k1-1 were replaced by new entries k0..m1-1.
+    """
+    p, q  = old.common(new)
+    end   = old.size - q                # changed: old[p:end] -> new[p:new.size - q]
+    delta = new.size - old.size
+    n     = len(store)
+    starts, ends = store.blocks[0::2], store.blocks[1::2]
+    # keep a block only if the marker tokens bounding it are unchanged too
+    k0 = bisect_right(ends, p - _MARKER_LEN)
+    k1 = max(k0, bisect_left(starts, end + 1))
+    lo = starts[k0] if 0 < k0 < n else 0
+    hi = starts[k1] + delta if k1 < n else new.size
+
+    fresh = PaletteStore(store.names)
+    fresh.name_ids = store.name_ids[:k0]
+    fresh.colors   = store.colors[:3*k0]
+    fresh.widths   = store.widths[:3*k0]
+    fresh.offsets  = store.offsets[:3*k0]
+    fresh.blocks   = store.blocks[:2*k0]
+    for e in scan_entries(data, lo, hi):
+        fresh.append(e)
+    m1 = len(fresh)
+    fresh.name_ids.extend(store.name_ids[k1:])
+    fresh.colors.extend(store.colors[3*k1:])
+    fresh.widths.extend(store.widths[3*k1:])
+    if delta:
+        fresh.offsets.extend(o + delta if o >= 0 else o for o in store.offsets[3*k1:])
+        fresh.blocks.extend(b + delta if b >= 0 else b for b in store.blocks[2*k1:])
+    else:
+        fresh.offsets.extend(store.offsets[3*k1:])
+        fresh.blocks.extend(store.blocks[2*k1:])
+    return fresh, (k0, k1, m1)
+
+
+def _local_keys(store, lo, hi):
+    """{(name, occurrence within lo..hi-1): index} – palette_keys over a range."""
+    seen, out = {}, {}
+    for i in range(lo, hi):
+        name = store.name(i)
+        n = seen.get(name, 0); seen[name] = n + 1
+        out[(name, n)] = i
+    return out
+
+
+def carry_edits(old, new, span):
+    """
+    Re-apply old's unsaved edits to new (from reparse_changed). An edit whose
+    value the file left alone is kept; one the file made the same is dropped.
+    Where the file changed the value differently the edit is still kept, so
+    nothing is lost, and it is returned as a conflict for the caller to
+    settle: [(new index or None, field index, name, base, mine, theirs)],
+    with theirs None when the entry or the field is gone from the file.
+    """
+    k0, k1, m1 = span
+    keys = {i: k for k, i in _local_keys(old, k0, k1).items()}
+    moved = _local_keys(new, k0, m1)
+    conflicts = []
+    for slot, mine in sorted(old.edits.items()):
+        i, fi = divmod(slot, 3)
+        j = i if i < k0 else i - k1 + m1 if i >= k1 else moved.get(keys[i])
+        base   = old.colors[slot]
+        theirs = new.original(j, fi) if j is not None else None
+        if theirs == base:
+            new.set(j, fi, mine)
+        elif theirs != mine:
+            if theirs is not None:
+                new.set(j, fi, mine)
+            conflicts.append((j if theirs is not None else None, fi, old.name(i),
+                              base, mine, theirs))
+    return conflicts
@@ -0,0 +1,106 @@
+"""
+Thread targets for loading and saving off the GUI thread.
+"""
+
+from .rejuice import scan_entries
+from .fileutil import file_state, mapped, sample_hash
+from .store import INDEX_ENABLED, PaletteStore, read_index, save_rejuice, write_index
+from .watch import FileState, reparse_changed
+from .workspace import Workspace
+
+def load_worker(path, out, cancel, batch=256, use_index=None):
+    """
+    Thread target: parse path and put messages on the queue out –
+      ("store", PaletteStore)                      on a valid .idx sidecar
+      ("batch", entries, byte_offset, file_size)  as entries arrive otherwise
+      ("done", watch) / ("error", exc)            when finished
+    watch is the file's FileState, taken from the buffer that was parsed.
+    A missing or stale sidecar is rewritten here, from a store of the
+    worker's own, so the receiver never has to. Stops quietly once the
+    cancel Event is set.
+    """
+    try:
+        use_index = INDEX_ENABLED if use_index is None else use_index
+        store = read_index(path) if use_index else None
+        if store is not None:
+            out.put(("store", store)); out.put(("done", FileState.capture(path)))
+            return
+        with mapped(path) as (st, buf):
+            state = st + (sample_hash(buf),)
+            size, chunk = st[0], []
+            shadow = PaletteStore() if use_index else None
+            for e in scan_entries(buf, 0, size):
+                if cancel.is_set():
+                    return
+                chunk.append(e)
+                if shadow is not None:
+                    shadow.append(e)
+                if len(chunk) >= batch:
+                    out.put(("batch", chunk, e["_block"][1], size)); chunk = []
+            out.put(("batch", chunk, size, size))
+            watch = FileState(path, buf, st)
+        if shadow is not None:
+            write_index(path, shadow, state)
+        out.put(("done", watch))
+    except Exception as e:
+        out.put(("error", e))
+
+
+def workspace_worker(paths, out, cancel, use_index=None):
+    """
+    Thread target: load paths concurrently as one Workspace and put messages
+    on the queue out – ("progress", files_done, files) as files finish, then
+    ("workspace", Workspace), ("done",) or ("error", exc). Files already being
+    parsed when cancel is set are finished, but nothing more is sent.
+    """
+    try:
+        ws = Workspace.load(paths, use_index=use_index,
+                            progress=lambda done, total: out.put(("progress", done, total)))
+        if not cancel.is_set():
+            out.put(("workspace", ws)); out.put(("done",))
+    except Exception as e:
+        out.put(("error", e))
+
+
+def save_worker(path, store, edits, out, backup=True, in_place=False, watch=False,
+                use_index=True):
+    """
+    Thread target: back up path, write the edits snapshot into it, refresh
+    its .idx sidecar and put ("done", patches, FileState of the written file
+    or None unless watch) or ("error", exc) on the queue out. The store is
+    only read here; the caller commits the patches on its own thread.
+    """
+    try:
+        # a copy takes the commit, so the caller's store is only read
+        patches = save_rejuice(path, store.copy(edits), backup=backup, in_place=in_place,
+                               use_index=use_index)
+        out.put(("done", patches, FileState.capture(path) if watch else None))
+    except Exception as e:
+        out.put(("error", e))
+
+
+def watch_worker(store, old, out):
+    """
+    Thread target: old.path no longer has old's size / mtime. Map it, hash it
+    and, when the content really changed, reparse the changed range against
+    store (whose originals must not change meanwhile), then refresh the .idx
+    sidecar for what was read. Puts on the queue out
+      ("changed", FileState, PaletteStore, span)   see reparse_changed
+      ("same", FileState)                          touched, content unchanged
+      ("busy",)                                    written to while read: retry
+      ("error", exc)
+    """
+    try:
+        with mapped(old.path) as (st, buf):
+            new = FileState(old.path, buf, st)
+            if new.digest == old.digest:
+                msg = ("same", new)
+            else:
+                msg = ("changed", new) + reparse_changed(store, old, new, buf)
+        if file_state(old.path) != st:
+            msg = ("busy",)
+        elif INDEX_ENABLED:
+            write_index(old.path, msg[2] if msg[0] == "changed" else store, new.index_state)
+        out.put(msg)
+    except Exception as e:
+        out.put(("error", e))
@@ -0,0 +1,118 @@
+"""
+Several .rejuice files edited together as one table.
+"""
+
+import os
+from bisect import bisect_right
+
+from .store import NameTable, PaletteStore, save_rejuice
+
+
+class Workspace:
+    """
+    The files of paths as one combined PaletteStore (self.store): the rows of
+    file k are starts[k] .. starts[k+1]-1, and every name is interned once in
+    a NameTable shared by all files. Edits go to the combined store as usual;
+    part(k) cuts file k's rows and edits back out for saving, and commit()
+    folds what was written back in. The combined offsets point into
+    different files, so the combined store itself is never written.
+    """
+
+    def __init__(self, paths, stores, names=None):
+        self.paths  = list(paths)
+        self.labels = [os.path.basename(p) for p in self.paths]
+        self.store  = PaletteStore(names if names is not None else
+                                   stores[0].names if stores else None)
+        self.starts = [0]
+        st = self.store
+        for part in stores:
+            if part.names is not st.names:
+                raise ValueError("workspace stores must share one NameTable")
+            st.name_ids.extend(part.name_ids)
+            st.colors.extend(part.colors)
+            st.widths.extend(part.widths)
+            st.offsets.extend(part.offsets)
+            st.blocks.extend(part.blocks)
+            self.starts.append(len(st))
+
+    @classmethod
+    def load(cls, paths, names=None, use_index=None, workers=None, progress=None):
+        """
+        Parse paths concurrently on a thread pool into one Workspace.
+        progress(done, total), if given, is called as each file finishes.
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        names  = names if names is not None else NameTable()
+        paths  = list(paths)
+        stores = [None] * len(paths)
+        workers = workers or max(1, min(len(paths), os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            jobs = {ex.submit(PaletteStore.load, p, names, use_index): k
+                    for k, p in enumerate(paths)}
+            for done, job in enumerate(as_completed(jobs), 1):
+                stores[jobs[job]] = job.result()
+                if progress:
+                    progress(done, len(paths))
+        return cls(paths, stores, names)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def source(self, i):
+        """Index of the file that combined row i comes from."""
+        return bisect_right(self.starts, i) - 1
+
+    def label(self, i):
+        """File name that combined row i comes from."""
+        return self.labels[self.source(i)]
+
+    def _edits(self, k):
+        lo, hi = self.starts[k] * 3, self.starts[k + 1] * 3
+        return {s - lo: v for s, v in self.store.edits.items() if lo <= s < hi}
+
+    def dirty_files(self):
+        """Indices of the files that have unsaved edits."""
+        return sorted({self.source(s // 3) for s in self.store.edits})
+
+    def part(self, k):
+        """File k on its own: a PaletteStore of copies of its columns and edits."""
+        lo, hi, st = self.starts[k], self.starts[k + 1], self.store
+        part = PaletteStore(st.names)
+        part.name_ids = st.name_ids[lo:hi]
+        part.colors   = st.colors[lo*3:hi*3]
+        part.widths   = st.widths[lo*3:hi*3]
+        part.offsets  = st.offsets[lo*3:hi*3]
+        part.blocks   = st.blocks[lo*2:hi*2]
+        part.edits    = self._edits(k)
+        return part
+
+    def commit(self, k, part, patches):
+        """
+        Fold patches written into file k from part (see part()) into the
+        combined store. Edits made since part was cut stay pending.
+        """
+        part.commit(patches)
+        lo, hi, st = self.starts[k], self.starts[k + 1], self.store
+        st.colors[lo*3:hi*3]  = part.colors
+        st.widths[lo*3:hi*3]  = part.widths
+        st.offsets[lo*3:hi*3] = part.offsets
+        st.blocks[lo*2:hi*2]  = part.blocks
+        for _, _, new, slot in patches:
+            slot += lo * 3
+            if st.edits.get(slot) == int(new, 16):
+                del st.edits[slot]
+
+    def save(self, backup=True, in_place=False, use_index=True):
+        """
+        Write every file that has edits, leaving clean files untouched.
+        Returns {path: [(entry, field index) not found in that file]}.
+        """
+        missed = {}
+        for k in self.dirty_files():
+            path, part = self.paths[k], self.part(k)
+            # save a copy so commit() below folds the patches in exactly once
+            patches = save_rejuice(path, part.copy(), backup=backup, in_place=in_place,
+                                   use_index=use_index)
+            self.commit(k, part, patches)
+            missed[path] = [divmod(slot, 3) for slot in sorted(part.edits)]
+        return missed
@@ -0,0 +1,1446 @@
+"""
+GearCamo Color Palette Editor  –  AFoP  ·  GUI
+==============================================
+Tk front end over afop_core: the color picker, dialogs, the palette table
+and the main window. Imported only when the editor runs without a subcommand.
+"""
+
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+import os, colorsys, threading, queue, time
+from collections import OrderedDict
+
+from afop_core import (ATLAS_ROWS, BULK_OPS, FIELDS, HUE_STEPS, PROFILER, PROFILE_TARGETS,
+                       BackupLog, ColorIndex, PaletteStore, SearchIndex, atlas_row_tops,
+                       atlas_swatch_box, bulk_transform, carry_edits, diff_stores,
+                       hex_str_to_rgb, hue_bar_ppm, load_worker, luma, rgb_to_hex_str,
+                       save_worker, sv_gradient_ppm, table_band_ppm, watch_worker,
+                       workspace_worker)
+from afop_core.diff import key_label
+from afop_core.theme import (BG, SURFACE, OVERLAY, TEXT, SUBTEXT, MAUVE, GREEN, BLUE, RED,
+                             ROW_H, COL_WIDTHS, HEADERS)
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  IMAGE CACHE
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ImageCache:
+    """
+    LRU cache of rendered PhotoImages bounded by a byte budget
+    (Tk keeps 4 bytes per pixel). One instance is shared by every
+    ColorPicker so re-opening the picker or scrubbing back over a hue
+    is a lookup instead of a render.
+    """
+
+    def __init__(self, budget=24 << 20):
+        self.budget = budget
+        self.used   = 0
+        self._items = OrderedDict()      # key -> (PhotoImage, bytes)
+
+    def get(self, key, W, H, render):
+        """Return the image for key, calling render() -> PPM bytes on a miss."""
+        hit = self._items.get(key)
+        if hit is not None:
+            self._items.move_to_end(key)
+            return hit[0]
+        img  = tk.PhotoImage(width=W, height=H, format="PPM", data=render())
+        cost = W * H * 4
+        self._items[key] = (img, cost)
+        self.used += cost
+        while self.used > self.budget and len(self._items) > 1:
+            _, (_, freed) = self._items.popitem(last=False)
+            self.used -= freed
+        return img
+
+    def clear(self):
+        self._items.clear()
+        self.used = 0
+
+
+IMAGE_CACHE = ImageCache()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  MODERN COLOR PICKER  (self-contained Toplevel)
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ColorPicker(tk.Toplevel):
+    """
+    A modern HSV color picker with:
+      • Saturation/Value square (click + drag)
+      • Hue bar  (click + drag)
+      • Live hex input
+      • R G B sliders
+      • Before / After preview strip
+    Returns result via .result  (#rrggbb or None if cancelled)
+    """
+
+    PAD  = 16
+
+    def __init__(self, parent, initial_color="#808080", title="Pick a colour",
+                 sq_width=450, sq_height=220, bar_height=22, preview_height=52,
+                 cache=None):
+        super().__init__(parent)
+        self.title(title)
+        self.configure(bg=BG)
+        self.resizable(True, True)
+        self.grab_set()
+        self.result = None
+
+        self.SQ_W      = sq_width       # width of the SV gradient area
+        self.SQ_H      = sq_height      # height of the SV gradient area
+        self.BAR       = bar_height     # height of the hue rainbow bar
+        self.PREVIEW_H = preview_height # height of the before/after preview strip
+        self._cache    = cache if cache is not None else IMAGE_CACHE
+
+        # parse initial
+        r,g,b = int(initial_color[1:3],16), int(initial_color[3:5],16), int(initial_color[5:7],16)
+        h,s,v = colorsys.rgb_to_hsv(r/255, g/255, b/255)
+        self._h = h   # 0-1
+        self._s = s   # 0-1
+        self._v = v   # 0-1
+        self._initial = initial_color
+        self._dragging = None   # 'sq' | 'hue'
+        self._idle_job = None   # pending coalesced redraw
+        self._idle_src = None
+
+        self._build()
+        self._redraw_sq()
+        self._redraw_hue()
+        self._update_all()
+
+        # center over parent
+        self.update_idletasks()
+        px = parent.winfo_rootx() + parent.winfo_width()//2  - self.winfo_width()//2
+        py = parent.winfo_rooty() + parent.winfo_height()//2 - self.winfo_height()//2
+        self.geometry(f"+{max(0,px)}+{max(0,py)}")
+
+    # ── layout ────────────────────────────────────────────────────────────────
+
+    def _build(self):
+        P = self.PAD
+
+        outer = tk.Frame(self, bg=BG, padx=P, pady=P)
+        outer.pack(fill="both", expand=True)
+
+        # ── SV gradient canvas ──
+        self.sq_canvas = tk.Canvas(outer, width=self.SQ_W, height=self.SQ_H,
+                                    highlightthickness=1, highlightbackground=OVERLAY,
+                                    cursor="crosshair")
+        self.sq_canvas.grid(row=0, column=0, columnspan=2, sticky="nsew")
+        self.sq_canvas.bind("<ButtonPress-1>",   self._sq_press)
+        self.sq_canvas.bind("<B1-Motion>",        self._sq_drag)
+        self.sq_canvas.bind("<ButtonRelease-1>",  lambda e: self._stop_drag())
+        self.sq_canvas.bind("<Configure>",        lambda e: self._redraw_sq())
+
+        # ── hue bar ──
+        self.hue_canvas = tk.Canvas(outer, width=self.SQ_W, height=self.BAR,
+                                     highlightthickness=1, highlightbackground=OVERLAY,
+                                     cursor="sb_h_double_arrow")
+        self.hue_canvas.grid(row=1, column=0, columnspan=2, pady=(8,0), sticky="ew")
+        self.hue_canvas.bind("<ButtonPress-1>",  self._hue_press)
+        self.hue_canvas.bind("<B1-Motion>",       self._hue_drag)
+        self.hue_canvas.bind("<ButtonRelease-1>", lambda e: self._stop_drag())
+        self.hue_canvas.bind("<Configure>",       lambda e: self._redraw_hue())
+
+        # persistent items – redraws only re-point the images and move markers
+        sq, hue = self.sq_canvas, self.hue_canvas
+        self._sq_item   = sq.create_image(0, 0, anchor="nw")
+        self._ring_out  = sq.create_oval(0, 0, 0, 0, outline="white", width=2)
+        self._ring_in   = sq.create_oval(0, 0, 0, 0, outline="black", width=1)
+        self._hue_item  = hue.create_image(0, 0, anchor="nw")
+        self._hue_mark  = hue.create_rectangle(0, 0, 0, 0, outline="white", width=2)
+        self._sq_key = self._hue_key = None   # what the current images show
+
+        # ── before / after preview ──
+        prev_frame = tk.Frame(outer, bg=BG)
+        prev_frame.grid(row=2, column=0, columnspan=2, pady=(10,0), sticky="ew")
+
+        tk.Label(prev_frame, text="Before", bg=BG, fg=SUBTEXT,
+                 font=("Consolas",8)).pack(side="left")
+        tk.Label(prev_frame, text="After", bg=BG, fg=SUBTEXT,
+                 font=("Consolas",8)).pack(side="right")
+
+        pv = tk.Frame(outer, height=self.PREVIEW_H, bg=BG)
+        pv.grid(row=3, column=0, columnspan=2, sticky="ew", pady=(2,0))
+        pv.grid_propagate(False)
+
+        self.prev_before = tk.Frame(pv, bg=self._initial)
+        self.prev_before.place(relx=0, rely=0, relwidth=0.5, relheight=1)
+        self.prev_after  = tk.Frame(pv, bg=self._initial)
+        self.prev_after .place(relx=0.5, rely=0, relwidth=0.5, relheight=1)
+
+        # ── hex input ──
+        hex_row = tk.Frame(outer, bg=BG)
+        hex_row.grid(row=4, column=0, columnspan=2, pady=(12,0), sticky="w")
+
+        tk.Label(hex_row, text="#", bg=BG, fg=SUBTEXT,
+                 font=("Consolas",12,"bold")).pack(side="left")
+        self._hex_var = tk.StringVar()
+        self._hex_entry = tk.Entry(hex_row, textvariable=self._hex_var,
+                                    width=7, bg=OVERLAY, fg=TEXT,
+                                    insertbackground=TEXT, relief="flat",
+                                    font=("Consolas",12,"bold"))
+        self._hex_entry.pack(side="left", ipady=4, padx=(2,8))
+        self._hex_var.trace_add("write", self._on_hex_typed)
+
+        # eyedropper label (cosmetic)
+        tk.Label(hex_row, text="HEX", bg=BG, fg=SUBTEXT,
+                 font=("Consolas",8)).pack(side="left")
+
+        outer.columnconfigure(0, weight=1)
+        outer.rowconfigure(0, weight=1)
+
+        # ── RGB sliders ──
+        sliders = tk.Frame(outer, bg=BG)
+        sliders.grid(row=5, column=0, columnspan=2, pady=(10,0), sticky="ew")
+
+        self._r_var = tk.IntVar()
+        self._g_var = tk.IntVar()
+        self._b_var = tk.IntVar()
+
+        for label, var, color in (("R", self._r_var, RED),
+                                   ("G", self._g_var, GREEN),
+                                   ("B", self._b_var, BLUE)):
+            row = tk.Frame(sliders, bg=BG)
+            row.pack(fill="x", pady=2)
+            tk.Label(row, text=label, bg=BG, fg=color,
+                     font=("Consolas",10,"bold"), width=2).pack(side="left")
+            sl = tk.Scale(row, variable=var, from_=0, to=255,
+                          orient="horizontal", bg=BG, fg=TEXT,
+                          troughcolor=OVERLAY, highlightthickness=0,
+                          activebackground=color, sliderrelief="flat",
+                          length=self.SQ_W-30, showvalue=True, resolution=1,
+                          command=lambda val, v=var: self._on_slider(v))
+            sl.pack(side="left", fill="x", expand=True)
+
+        # ── buttons ──
+        btn_row = tk.Frame(outer, bg=BG)
+        btn_row.grid(row=6, column=0, columnspan=2, pady=(14,0), sticky="ew")
+
+        def mkbtn(text, cmd, fg):
+            tk.Button(btn_row, text=text, command=cmd,
+                      bg=OVERLAY, fg=fg, relief="flat",
+                      font=("Consolas",10,"bold"), padx=16, pady=6,
+                      cursor="hand2", activebackground="#45475a",
+                      activeforeground=fg).pack(side="left", expand=True, fill="x", padx=(0,4))
+
+        mkbtn("✓  Apply", self._apply, GREEN)
+        mkbtn("✗  Cancel", self._cancel, RED)
+
+        self.bind("<Return>",  lambda e: self._apply())
+        self.bind("<Escape>",  lambda e: self._cancel())
+
+    # ── drawing ───────────────────────────────────────────────────────────────
+
+    def _redraw_sq(self):
+        """Move the crosshair; swap the SV gradient only if hue or size changed."""
+        c = self.sq_canvas
+        W = c.winfo_width()  or self.SQ_W
+        H = c.winfo_height() or self.SQ_H
+        if W < 2 or H < 2:
+            return
+        key = ("sv", round(self._h * HUE_STEPS) % HUE_STEPS, W, H)
+        if self._sq_key != key:
+            self._sq_key = key
+            self._sq_img = self._cache.get(key, W, H,
+                lambda: sv_gradient_ppm(key[1] / HUE_STEPS, W, H))
+            c.itemconfigure(self._sq_item, image=self._sq_img)
+        # crosshair
+        cx = int(self._s * (W-1))
+        cy = int((1 - self._v) * (H-1))
+        r = 7
+        c.coords(self._ring_out, cx-r, cy-r, cx+r, cy+r)
+        c.coords(self._ring_in,  cx-r+1, cy-r+1, cx+r-1, cy+r-1)
+
+    def _redraw_hue(self):
+        """Move the hue marker; swap the rainbow bar only if its size changed."""
+        c = self.hue_canvas
+        W = c.winfo_width()  or self.SQ_W
+        H = c.winfo_height() or self.BAR
+        if W < 2 or H < 2:
+            return
+        key = ("hue", W, H)
+        if self._hue_key != key:
+            self._hue_key = key
+            self._hue_img = self._cache.get(key, W, H, lambda: hue_bar_ppm(W, H))
+            c.itemconfigure(self._hue_item, image=self._hue_img)
+        # marker
+        mx = int(self._h * (W-1))
+        c.coords(self._hue_mark, mx-3, 0, mx+3, H)
+
+    def _schedule(self, source=None):
+        """Coalesce bursts of drag / typing events into one redraw per idle cycle."""
+        self._idle_src = source
+        if self._idle_job is None:
+            self._idle_job = self.after_idle(self._flush)
+
+    def _flush(self):
+        self._idle_job = None
+        self._redraw_sq()
+        self._redraw_hue()
+        self._update_all(source=self._idle_src)
+
+    # ── update helpers ────────────────────────────────────────────────────────
+
+    def _hsv_to_html(self):
+        r,g,b = colorsys.hsv_to_rgb(self._h, self._s, self._v)
+        return f"#{int(r*255):02x}{int(g*255):02x}{int(b*255):02x}"
+
+    def _update_all(self, source=None):
+        html = self._hsv_to_html()
+        # preview
+        self.prev_after.configure(bg=html)
+        # hex entry (suppress re-trigger)
+        if source != "hex":
+            self._hex_var.trace_remove("write", self._hex_var.trace_info()[0][1]) \
+                if self._hex_var.trace_info() else None
+            self._hex_var.set(html[1:].upper())
+            self._hex_var.trace_add("write", self._on_hex_typed)
+        # sliders
+        r,g,b = colorsys.hsv_to_rgb(self._h, self._s, self._v)
+        if source != "slider":
+            self._r_var.set(int(r*255))
+            self._g_var.set(int(g*255))
+            self._b_var.set(int(b*255))
+
+    # ── events ────────────────────────────────────────────────────────────────
+
+    def _sq_press(self, e):
+        self._dragging = "sq"; self._sq_move(e.x, e.y)
+
+    def _sq_drag(self, e):
+        if self._dragging == "sq": self._sq_move(e.x, e.y)
+
+    def _sq_move(self, x, y):
+        W = self.sq_canvas.winfo_width()  or self.SQ_W
+        H = self.sq_canvas.winfo_height() or self.SQ_H
+        self._s = max(0, min(1, x / (W-1)))
+        self._v = max(0, min(1, 1 - y / (H-1)))
+        self._schedule()
+
+    def _hue_press(self, e):
+        self._dragging = "hue"; self._hue_move(e.x)
+
+    def _hue_drag(self, e):
+        if self._dragging == "hue": self._hue_move(e.x)
+
+    def _hue_move(self, x):
+        W = self.hue_canvas.winfo_width() or self.SQ_W
+        self._h = max(0, min(1, x / (W-1)))
+        self._schedule()
+
+    def _stop_drag(self):
+        self._dragging = None
+
+    def _on_hex_typed(self, *_):
+        raw = self._hex_var.get().strip().lstrip("#")
+        if len(raw) == 6:
+            try:
+                r,g,b = int(raw[0:2],16), int(raw[2:4],16), int(raw[4:6],16)
+                self._h, self._s, self._v = colorsys.rgb_to_hsv(r/255, g/255, b/255)
+                self._schedule(source="hex")
+            except ValueError:
+                pass
+
+    def _on_slider(self, changed_var):
+        r,g,b = self._r_var.get(), self._g_var.get(), self._b_var.get()
+        self._h, self._s, self._v = colorsys.rgb_to_hsv(r/255, g/255, b/255)
+        self._schedule(source="slider")
+
+    def _apply(self):
+        self.result = self._hsv_to_html()
+        self.destroy()
+
+    def _cancel(self):
+        self.result = None
+        self.destroy()
+
+    def destroy(self):
+        if self._idle_job is not None:
+            self.after_cancel(self._idle_job)
+            self._idle_job = None
+        super().destroy()
+
+
+def ask_color(parent, initial="#808080", title="Pick a colour"):
+    """Blocking call – returns '#rrggbb' or None."""
+    picker = ColorPicker(parent, initial, title)
+    parent.wait_window(picker)
+    return picker.result
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  BULK EDIT DIALOG
+# ══════════════════════════════════════════════════════════════════════════════
+
+class BulkDialog(tk.Toplevel):
+    """
+    Pick one bulk transform, its parameters and the color columns it touches.
+    Returns via .result  ((op, [field indices], params) or None if cancelled)
+    """
+
+    def __init__(self, parent, count):
+        super().__init__(parent)
+        self.title("Bulk edit")
+        self.configure(bg=BG, padx=16, pady=16)
+        self.resizable(False, False)
+        self.grab_set()
+        self.result = None
+
+        self._op     = tk.StringVar(value="hue")
+        self._deg    = tk.DoubleVar(value=0)
+        self._sat    = tk.DoubleVar(value=100)
+        self._val    = tk.DoubleVar(value=100)
+        self._amount = tk.DoubleVar(value=25)
+        self._dist   = tk.DoubleVar(value=30)
+        self._colors = {"color": "#808080", "source": "#808080", "target": "#808080"}
+        self._fields = [tk.BooleanVar(value=True) for _ in FIELDS]
+
+        tk.Label(self, text=f"Applies to the {count} entries shown by the current search",
+                 bg=BG, fg=SUBTEXT, font=("Consolas",9)).pack(anchor="w", pady=(0,8))
+
+        def radio(op):
+            tk.Radiobutton(self, text=BULK_OPS[op], variable=self._op, value=op,
+                           bg=BG, fg=MAUVE, selectcolor=OVERLAY, activebackground=BG,
+                           activeforeground=MAUVE, font=("Consolas",10,"bold"),
+                           anchor="w").pack(fill="x", pady=(6,0))
+
+        def slider(var, label, lo, hi):
+            row = tk.Frame(self, bg=BG); row.pack(fill="x", padx=(24,0))
+            tk.Label(row, text=label, bg=BG, fg=TEXT, width=12, anchor="w",
+                     font=("Consolas",9)).pack(side="left")
+            tk.Scale(row, variable=var, from_=lo, to=hi, orient="horizontal",
+                     bg=BG, fg=TEXT, troughcolor=OVERLAY, highlightthickness=0,
+                     sliderrelief="flat", length=260).pack(side="left", fill="x")
+
+        def swatch(key, label):
+            row = tk.Frame(self, bg=BG); row.pack(fill="x", padx=(24,0), pady=2)
+            tk.Label(row, text=label, bg=BG, fg=TEXT, width=12, anchor="w",
+                     font=("Consolas",9)).pack(side="left")
+            btn = tk.Button(row, width=6, bg=self._colors[key], relief="flat",
+                            activebackground=self._colors[key], cursor="hand2")
+            btn.configure(command=lambda: self._pick(key, btn))
+            btn.pack(side="left")
+
+        radio("hue");    slider(self._deg, "Degrees", -180, 180)
+        radio("satval"); slider(self._sat, "Saturation %", 0, 300)
+        slider(self._val, "Value %", 0, 300)
+        radio("tint");   swatch("color", "Tint"); slider(self._amount, "Amount %", 0, 100)
+        radio("remap");  swatch("source", "From"); swatch("target", "To")
+        slider(self._dist, "Distance", 0, 442)
+
+        cols = tk.Frame(self, bg=BG); cols.pack(fill="x", pady=(12,0))
+        for field, var in zip(FIELDS, self._fields):
+            tk.Checkbutton(cols, text=field, variable=var, bg=BG, fg=TEXT,
+                           selectcolor=OVERLAY, activebackground=BG,
+                           font=("Consolas",9)).pack(side="left")
+
+        btn_row = tk.Frame(self, bg=BG); btn_row.pack(fill="x", pady=(14,0))
+        for text, cmd, fg in (("✓  Apply", self._apply, GREEN),
+                              ("✗  Cancel", self.destroy, RED)):
+            tk.Button(btn_row, text=text, command=cmd, bg=OVERLAY, fg=fg,
+                      relief="flat", font=("Consolas",10,"bold"), padx=16, pady=6,
+                      cursor="hand2", activebackground="#45475a",
+                      activeforeground=fg).pack(side="left", expand=True, fill="x",
+                                                padx=(0,4))
+        self.bind("<Return>", lambda e: self._apply())
+        self.bind("<Escape>", lambda e: self.destroy())
+
+    def _pick(self, key, btn):
+        html = ask_color(self, initial=self._colors[key], title=f"Bulk edit · {key}")
+        if html:
+            self._colors[key] = html
+            btn.configure(bg=html, activebackground=html)
+
+    def _apply(self):
+        op     = self._op.get()
+        fields = [fi for fi, var in enumerate(self._fields) if var.get()]
+        params = {"hue":    lambda: {"degrees": self._deg.get()},
+                  "satval": lambda: {"sat": self._sat.get() / 100,
+                                     "val": self._val.get() / 100},
+                  "tint":   lambda: {"color": self._colors["color"],
+                                     "amount": self._amount.get() / 100},
+                  "remap":  lambda: {"source": self._colors["source"],
+                                     "target": self._colors["target"],
+                                     "distance": self._dist.get()}}[op]()
+        self.result = (op, fields, params)
+        self.destroy()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  COLOR QUERY DIALOG
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ColorQueryDialog(tk.Toplevel):
+    """
+    Pick a query color, a ΔE radius and/or a k-nearest limit and the color
+    columns to search. Returns via .result  ((html, threshold, k, [fields]) or None)
+    """
+
+    def __init__(self, parent, initial="#808080"):
+        super().__init__(parent)
+        self.title("Find by color")
+        self.configure(bg=BG, padx=16, pady=16)
+        self.resizable(False, False)
+        self.grab_set()
+        self.result = None
+
+        self._color  = initial
+        self._use_de = tk.BooleanVar(value=True)
+        self._de     = tk.DoubleVar(value=10)
+        self._use_k  = tk.BooleanVar(value=False)
+        self._k      = tk.IntVar(value=20)
+        self._fields = [tk.BooleanVar(value=True) for _ in FIELDS]
+
+        row = tk.Frame(self, bg=BG); row.pack(fill="x")
+        tk.Label(row, text="Color", bg=BG, fg=TEXT, width=12, anchor="w",
+                 font=("Consolas",9)).pack(side="left")
+        self._btn = tk.Button(row, width=6, bg=initial, relief="flat",
+                              activebackground=initial, cursor="hand2", command=self._pick)
+        self._btn.pack(side="left")
+
+        def limit(use, var, label, lo, hi, res):
+            row = tk.Frame(self, bg=BG); row.pack(fill="x", pady=(6,0))
+            tk.Checkbutton(row, text=label, variable=use, bg=BG, fg=MAUVE, width=11,
+                           anchor="w", selectcolor=OVERLAY, activebackground=BG,
+                           font=("Consolas",9,"bold")).pack(side="left")
+            tk.Scale(row, variable=var, from_=lo, to=hi, resolution=res,
+                     orient="horizontal", bg=BG, fg=TEXT, troughcolor=OVERLAY,
+                     highlightthickness=0, sliderrelief="flat",
+                     length=260).pack(side="left", fill="x")
+
+        limit(self._use_de, self._de, "Within ΔE", 0, 100, 0.5)
+        limit(self._use_k,  self._k,  "Nearest k", 1, 500, 1)
+
+        cols = tk.Frame(self, bg=BG); cols.pack(fill="x", pady=(12,0))
+        for field, var in zip(FIELDS, self._fields):
+            tk.Checkbutton(cols, text=field, variable=var, bg=BG, fg=TEXT,
+                           selectcolor=OVERLAY, activebackground=BG,
+                           font=("Consolas",9)).pack(side="left")
+
+        btn_row = tk.Frame(self, bg=BG); btn_row.pack(fill="x", pady=(14,0))
+        for text, cmd, fg in (("✓  Find", self._apply, GREEN),
+                              ("✗  Cancel", self.destroy, RED)):
+            tk.Button(btn_row, text=text, command=cmd, bg=OVERLAY, fg=fg,
+                      relief="flat", font=("Consolas",10,"bold"), padx=16, pady=6,
+                      cursor="hand2", activebackground="#45475a",
+                      activeforeground=fg).pack(side="left", expand=True, fill="x",
+                                                padx=(0,4))
+        self.bind("<Return>", lambda e: self._apply())
+        self.bind("<Escape>", lambda e: self.destroy())
+
+    def _pick(self):
+        html = ask_color(self, initial=self._color, title="Find by color")
+        if html:
+            self._color = html
+            self._btn.configure(bg=html, activebackground=html)
+
+    def _apply(self):
+        fields = [fi for fi, var in enumerate(self._fields) if var.get()]
+        if not fields:
+            return
+        self.result = (self._color,
+                       self._de.get() if self._use_de.get() else None,
+                       self._k.get()  if self._use_k.get()  else None,
+                       fields)
+        self.destroy()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  BACKUP DIALOG
+# ══════════════════════════════════════════════════════════════════════════════
+
+class BackupDialog(tk.Toplevel):
+    """Lists backup generations. Returns via .result (generation or None)."""
+
+    def __init__(self, parent, generations):
+        super().__init__(parent)
+        self.title("Backups")
+        self.configure(bg=BG, padx=16, pady=16)
+        self.grab_set()
+        self.result = None
+        self._gens  = generations
+
+        self._list = tk.Listbox(self, bg=SURFACE, fg=TEXT, selectbackground=OVERLAY,
+                                selectforeground=MAUVE, relief="flat", width=52,
+                                height=min(12, len(generations)),
+                                font=("Consolas",10), highlightthickness=0)
+        for gen, t, n in generations:
+            when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t))
+            what = "full snapshot (.bak)" if gen == 0 else f"{n} value(s) changed"
+            self._list.insert("end", f"#{gen:<3} {when}   {what}")
+        self._list.pack(fill="both", expand=True)
+        self._list.selection_set("end")
+        self._list.bind("<Double-Button-1>", lambda e: self._apply())
+
+        btn_row = tk.Frame(self, bg=BG); btn_row.pack(fill="x", pady=(14,0))
+        for text, cmd, fg in (("⟲  Restore", self._apply, GREEN),
+                              ("✗  Cancel", self.destroy, RED)):
+            tk.Button(btn_row, text=text, command=cmd, bg=OVERLAY, fg=fg,
+                      relief="flat", font=("Consolas",10,"bold"), padx=16, pady=6,
+                      cursor="hand2", activebackground="#45475a",
+                      activeforeground=fg).pack(side="left", expand=True, fill="x",
+                                                padx=(0,4))
+        self.bind("<Escape>", lambda e: self.destroy())
+
+    def _apply(self):
+        sel = self._list.curselection()
+        if sel:
+            self.result = self._gens[sel[0]][0]
+        self.destroy()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  DIFF VIEW
+# ══════════════════════════════════════════════════════════════════════════════
+
+class DiffView(tk.Toplevel):
+    """
+    Side-by-side view of a diff_stores() result: one row per changed value
+    with both colors, then entries only in one file. take(changed rows) is
+    called by "Take B" with the rows whose B value can be applied to A.
+    """
+
+    COLS = (("Name", 230), ("Field", 160), ("A", 170), ("B", 170))
+
+    def __init__(self, parent, name_a, name_b, diff, take=None):
+        super().__init__(parent)
+        self.title(f"Compare  {name_a}  ⇄  {name_b}")
+        self.configure(bg=BG, padx=16, pady=16)
+        self.geometry("800x520")
+        self._diff, self._take = diff, take
+
+        ch, ad, rm = diff["changed"], diff["added"], diff["removed"]
+        tk.Label(self, text=f"A = {name_a}   B = {name_b}   ·   {len(ch)} changed  ·  "
+                            f"{len(ad)} only in B  ·  {len(rm)} only in A",
+                 bg=BG, fg=SUBTEXT, font=("Consolas",9)).pack(anchor="w", pady=(0,8))
+
+        head = tk.Canvas(self, height=ROW_H, bg=OVERLAY, highlightthickness=0)
+        head.pack(fill="x")
+        x = 0
+        for h, w in self.COLS:
+            head.create_text(x + 8, ROW_H//2, text=h, fill=MAUVE, anchor="w",
+                             font=("Consolas",10,"bold"))
+            x += w
+
+        body = tk.Frame(self, bg=BG); body.pack(fill="both", expand=True)
+        c = self.canvas = tk.Canvas(body, bg=SURFACE, highlightthickness=0)
+        vsb = ttk.Scrollbar(body, orient="vertical", command=c.yview)
+        c.configure(yscrollcommand=vsb.set)
+        vsb.pack(side="right", fill="y"); c.pack(side="left", fill="both", expand=True)
+        c.bind("<MouseWheel>", lambda e: c.yview_scroll(-1*(e.delta//120), "units"))
+        c.bind("<Button-4>", lambda e: c.yview_scroll(-1,"units"))
+        c.bind("<Button-5>", lambda e: c.yview_scroll( 1,"units"))
+
+        xs   = [sum(w for _, w in self.COLS[:k]) for k in range(len(self.COLS) + 1)]
+        rows = [(key, FIELDS[fi], old, new) for key, _, _, fi, old, new in ch]
+        rows += [(key, "entry only in B", None, None) for key, _ in ad]
+        rows += [(key, "entry only in A", None, None) for key, _ in rm]
+        for r, (key, what, old, new) in enumerate(rows):
+            y = r * ROW_H
+            c.create_rectangle(0, y, xs[-1], y + ROW_H,
+                               fill=SURFACE if r % 2 else BG, outline="")
+            c.create_text(8, y + ROW_H/2, text=key_label(key), fill=TEXT, anchor="w",
+                          font=("Consolas",9))
+            c.create_text(xs[1] + 8, y + ROW_H/2, text=what, anchor="w", font=("Consolas",9),
+                          fill=SUBTEXT if old is None and new is None else TEXT)
+            for x, v in ((xs[2], old), (xs[3], new)):
+                if old is None and new is None:
+                    continue
+                if v is None:
+                    c.create_text(x + 8, y + ROW_H/2, text="—", fill=SUBTEXT, anchor="w",
+                                  font=("Consolas",10))
+                    continue
+                c.create_rectangle(x + 8, y + 8, x + 36, y + ROW_H - 8,
+                                   fill=f"#{v & 0xFFFFFF:06x}", outline=OVERLAY)
+                c.create_text(x + 44, y + ROW_H/2, text=f"0x{v:08x}", fill=TEXT,
+                              anchor="w", font=("Consolas",9))
+        c.configure(scrollregion=(0, 0, xs[-1], max(len(rows) * ROW_H, 1)))
+
+        btn_row = tk.Frame(self, bg=BG); btn_row.pack(fill="x", pady=(14,0))
+        buttons = [("✗  Close", self.destroy, RED)]
+        if take is not None:
+            buttons.insert(0, ("⇐  Take B's values", self._apply, GREEN))
+        for text, cmd, fg in buttons:
+            tk.Button(btn_row, text=text, command=cmd, bg=OVERLAY, fg=fg,
+                      relief="flat", font=("Consolas",10,"bold"), padx=16, pady=6,
+                      cursor="hand2", activebackground="#45475a",
+                      activeforeground=fg).pack(side="left", expand=True, fill="x",
+                                                padx=(0,4))
+        self.bind("<Escape>", lambda e: self.destroy())
+
+    def _apply(self):
+        self._take([r for r in self._diff["changed"]
+                    if r[4] is not None and r[5] is not None])
+        self.destroy()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  CANVAS TABLE
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ColorTable(tk.Frame):
+    """
+    Virtualized table: only rows inside the current yview (plus OVERSCAN rows
+    either side) have canvas items. A fixed pool of row slots is recycled as
+    the view scrolls, while scrollregion stays sized to the full list.
+    virtual=False gives every row a slot (the old draw-everything behaviour).
+    atlas=True renders backgrounds, grid and swatches of ATLAS_ROWS rows at a
+    time into one PhotoImage (see table_band_ppm); only the text stays as
+    canvas items, and an edit repaints its swatch inside the image.
+    In a workspace, load(source=...) labels each row with the file it comes
+    from, right-aligned in the name column.
+    """
+
+    OVERSCAN = 8
+
+    def __init__(self, master, on_edit_callback, virtual=True, atlas=False, **kw):
+        super().__init__(master, bg=BG, **kw)
+        self.on_edit  = on_edit_callback
+        self.store    = PaletteStore()
+        self.visible  = []
+        self.virtual  = virtual
+        self.atlas    = atlas
+        self.source   = None    # entry_idx -> file label, in a workspace
+        self._slots   = []      # per slot: list of canvas item ids
+        self._shown   = []      # per slot: row index it shows, None if hidden
+        self._styles  = {}      # entry_idx -> per-field (html, fg) or None
+        self._tiles   = {}      # atlas band -> (PhotoImage, canvas item, first pixel row)
+        self._build()
+
+    def _build(self):
+        self.header_canvas = tk.Canvas(self, height=ROW_H, bg=OVERLAY,
+                                        highlightthickness=0)
+        self.header_canvas.pack(fill="x")
+        self.header_canvas.bind("<Configure>", lambda e: self._draw_header())
+
+        body = tk.Frame(self, bg=BG)
+        body.pack(fill="both", expand=True)
+
+        self.canvas = tk.Canvas(body, bg=SURFACE, highlightthickness=0)
+        vsb = ttk.Scrollbar(body, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=lambda *a: (vsb.set(*a), self._render_window()))
+        vsb.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>",       lambda e: self._redraw())
+        self.canvas.bind("<Double-Button-1>",  self._on_dbl)
+        self.canvas.bind("<MouseWheel>",
+            lambda e: self.canvas.yview_scroll(-1*(e.delta//120), "units"))
+        self.canvas.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1,"units"))
+        self.canvas.bind("<Button-5>", lambda e: self.canvas.yview_scroll( 1,"units"))
+
+    def load(self, store, visible=None, source=None):
+        if store is not self.store:
+            self._styles = {}
+        self.store   = store
+        self.visible = visible if visible is not None else list(range(len(store)))
+        self.source  = source
+        self._redraw()
+
+    def _draw_header(self):
+        c = self.header_canvas; c.delete("all"); x = 0
+        for h, w in zip(HEADERS, COL_WIDTHS):
+            c.create_rectangle(x, 0, x+w, ROW_H, fill=OVERLAY, outline="#45475a")
+            c.create_text(x+w//2, ROW_H//2, text=h, fill=MAUVE,
+                          font=("Consolas",10,"bold"), anchor="center")
+            x += w
+        if self.source:
+            c.create_text(COL_WIDTHS[0]-8, ROW_H//2, text="file", fill=SUBTEXT,
+                          font=("Consolas",8), anchor="e")
+
+    def _redraw(self):
+        total_h = ROW_H * len(self.visible)
+        total_w = sum(COL_WIDTHS)
+        self._shown = [-1] * len(self._slots)     # -1: stale, must be refilled
+        for _, item, _ in self._tiles.values():
+            self.canvas.delete(item)
+        self._tiles = {}
+        self.canvas.configure(scrollregion=(0,0,total_w,max(total_h,1)))
+        self._render_window()
+        self._draw_header()
+
+    def _render_window(self):
+        """Point the slot pool at the rows currently in view."""
+        c = self.canvas
+        if self.virtual:
+            top   = c.canvasy(0)
+            first = max(0, int(top // ROW_H) - self.OVERSCAN)
+            last  = min(len(self.visible),
+                        int((top + c.winfo_height()) // ROW_H) + 1 + self.OVERSCAN)
+        else:
+            first, last = 0, len(self.visible)
+        n = last - first
+        if n > len(self._slots):
+            self._slots += [self._new_slot() for _ in range(n - len(self._slots))]
+            self._shown  = [-1] * len(self._slots)
+        size = len(self._slots)
+        used = set()
+        for row_i in range(first, last):
+            k = row_i % size
+            used.add(k)
+            if self._shown[k] != row_i:
+                self._fill_slot(self._slots[k], row_i)
+                self._shown[k] = row_i
+        for k in range(size):
+            if k not in used and self._shown[k] is not None:
+                for item in self._slots[k]:
+                    c.itemconfigure(item, state="hidden")
+                self._shown[k] = None
+        if self.atlas:
+            self._render_tiles(first, last)
+
+    def _render_tiles(self, first, last):
+        """Keep band images for exactly the bands that rows first..last touch."""
+        c    = self.canvas
+        want = set(range(first // ATLAS_ROWS, (last - 1) // ATLAS_ROWS + 1)) if last > first else set()
+        for band in set(self._tiles) - want:
+            c.delete(self._tiles.pop(band)[1])
+        for band in want - set(self._tiles):
+            r0 = band * ATLAS_ROWS
+            rows = self.visible[r0:r0 + ATLAS_ROWS]
+            colors = [tuple(int(st[0][1:], 16) if st else None for st in self._style(i))
+                      for i in rows]
+            top = atlas_row_tops(r0, 0)[0]
+            img = tk.PhotoImage(format="PPM", data=table_band_ppm(r0, colors))
+            item = c.create_image(0, top, image=img, anchor="nw")
+            c.tag_lower(item)
+            self._tiles[band] = (img, item, top)
+
+    def _new_slot(self):
+        c = self.canvas
+        if self.atlas:                          # text only: the band image has the rest
+            ids = ([c.create_text(0, 0, fill=TEXT, font=("Consolas",10), anchor="w",
+                                  state="hidden")] +
+                   [c.create_text(0, 0, anchor="center", state="hidden") for _ in FIELDS])
+            return ids + [self._new_source_item()]
+        ids = [c.create_rectangle(0, 0, 0, 0, outline="#3a3a52", state="hidden"),
+               c.create_text(0, 0, fill=TEXT, font=("Consolas",10), anchor="w",
+                             state="hidden")]
+        for _ in FIELDS:
+            ids += [c.create_rectangle(0, 0, 0, 0, outline="#3a3a52", state="hidden"),
+                    c.create_rectangle(0, 0, 0, 0, outline="#000000", state="hidden"),
+                    c.create_text(0, 0, anchor="center", state="hidden")]
+        return ids + [self._new_source_item()]
+
+    def _new_source_item(self):
+        """Last item of every slot: the workspace file label, drawn over the row."""
+        return self.canvas.create_text(0, 0, fill=SUBTEXT, font=("Consolas",8),
+                                       anchor="e", state="hidden")
+
+    def _style(self, entry_idx):
+        """Derived (html, fg) per field, cached until update_cell drops it."""
+        st = self._styles.get(entry_idx)
+        if st is None:
+            st = []
+            for fi in range(len(FIELDS)):
+                html, _ = hex_str_to_rgb(self.store.text(entry_idx, fi))
+                st.append((html, "#000000" if luma(html)>128 else "#ffffff")
+                          if html else None)
+            self._styles[entry_idx] = st
+        return st
+
+    def _fill_slot(self, ids, row_i):
+        c   = self.canvas
+        entry_idx = self.visible[row_i]
+        st  = self._style(entry_idx)
+        y0  = row_i * ROW_H; y1 = y0 + ROW_H; ym = (y0+y1)//2
+        if self.source:
+            c.coords(ids[-1], COL_WIDTHS[0]-8, ym)
+            c.itemconfigure(ids[-1], text=self.source(entry_idx), state="normal")
+        else:
+            c.itemconfigure(ids[-1], state="hidden")
+        if self.atlas:
+            c.coords(ids[0], 10, ym)
+            c.itemconfigure(ids[0], text=self.store.name(entry_idx), state="normal")
+            x = COL_WIDTHS[0]
+            for fi, field in enumerate(FIELDS):
+                w = COL_WIDTHS[fi+1]
+                c.coords(ids[1+fi], x+w//2, ym)
+                c.itemconfigure(ids[1+fi], tags=(f"tx:{entry_idx}:{field}",))
+                self._paint_cell(None, ids[1+fi], self.store.text(entry_idx, fi), st[fi])
+                x += w
+            return
+        row_bg = SURFACE if row_i%2==0 else "#252538"
+
+        x = 0
+        c.coords(ids[0], x, y0, x+COL_WIDTHS[0], y1)
+        c.itemconfigure(ids[0], fill=row_bg, state="normal")
+        c.coords(ids[1], x+10, ym)
+        c.itemconfigure(ids[1], text=self.store.name(entry_idx), state="normal")
+        x += COL_WIDTHS[0]
+
+        for fi, field in enumerate(FIELDS):
+            bg, swatch, label = ids[2+3*fi:5+3*fi]
+            w   = COL_WIDTHS[fi+1]
+            pad = 6
+            c.coords(bg, x, y0, x+w, y1)
+            c.itemconfigure(bg, fill=row_bg, state="normal")
+            c.coords(swatch, x+pad, y0+4, x+w-pad, y1-4)
+            c.coords(label, x+w//2, ym)
+            c.itemconfigure(swatch, tags=(f"sw:{entry_idx}:{field}",))
+            c.itemconfigure(label,  tags=(f"tx:{entry_idx}:{field}",))
+            self._paint_cell(swatch, label, self.store.text(entry_idx, fi), st[fi])
+            x += w
+
+    def _paint_cell(self, swatch, label, val, style):
+        c = self.canvas
+        if style:
+            html, fg = style
+            if swatch is not None:
+                c.itemconfigure(swatch, fill=html, state="normal")
+            c.itemconfigure(label, text=val, fill=fg, font=("Consolas",9),
+                            state="normal")
+        else:
+            if swatch is not None:
+                c.itemconfigure(swatch, state="hidden")
+            c.itemconfigure(label, text="—", fill=SUBTEXT, font=("Consolas",10),
+                            state="normal")
+
+    def refresh(self):
+        """Drop every cached cell style and repaint, after a bulk change."""
+        self._styles = {}
+        self._redraw()
+
+    def update_cell(self, entry_idx, field):
+        """Repaint one cell after its value changed; a no-op if it is off screen."""
+        self._styles.pop(entry_idx, None)
+        fi    = FIELDS.index(field)
+        style = self._style(entry_idx)[fi]
+        if self.atlas:
+            self._paint_cell(None, f"tx:{entry_idx}:{field}",
+                             self.store.text(entry_idx, fi), style)
+            for band, (img, _, top) in self._tiles.items():
+                r0 = band * ATLAS_ROWS
+                for row_i in range(r0, min(r0 + ATLAS_ROWS, len(self.visible))):
+                    if self.visible[row_i] == entry_idx and style:
+                        t, b = atlas_row_tops(row_i, 1)
+                        x0, y0, x1, y1 = atlas_swatch_box(fi, t - top, b - top)
+                        img.put(style[0], to=(x0, y0, x1, y1))
+            return
+        self._paint_cell(f"sw:{entry_idx}:{field}", f"tx:{entry_idx}:{field}",
+                         self.store.text(entry_idx, fi), style)
+
+    def _on_dbl(self, event):
+        cy = self.canvas.canvasy(event.y); cx = event.x
+        row_i = int(cy // ROW_H)
+        if row_i < 0 or row_i >= len(self.visible): return
+        x, col = 0, -1
+        for ci, w in enumerate(COL_WIDTHS):
+            if cx < x+w: col = ci; break
+            x += w
+        if col <= 0: return
+        field     = FIELDS[col-1]
+        entry_idx = self.visible[row_i]
+        name      = self.store.name(entry_idx)
+        if not self.store.has(entry_idx, col-1): return     # "—" cells have no color
+        init_color, alpha = hex_str_to_rgb(self.store.text(entry_idx, col-1))
+
+        new_html = ask_color(self.winfo_toplevel(),
+                             initial=init_color,
+                             title=f"{field}  ·  {name}")
+        if new_html is None: return
+        self.store.set(entry_idx, col-1, int(rgb_to_hex_str(new_html, alpha), 16))
+        self.on_edit(entry_idx)
+        self.update_cell(entry_idx, field)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  MAIN APP
+# ══════════════════════════════════════════════════════════════════════════════
+
+def canvas_items(widget):
+    """Total canvas items under widget (including its Toplevels)."""
+    n = len(widget.find_all()) if isinstance(widget, tk.Canvas) else 0
+    return n + sum(canvas_items(w) for w in widget.winfo_children())
+
+
+class App(tk.Tk):
+    TABLE_ATLAS     = False     # band images instead of per-cell canvas items (--table-atlas)
+    SEARCH_DELAY_MS = 150
+    LOAD_POLL_MS    = 50
+    SAVE_IN_PLACE   = False     # patch changed bytes via mmap, not atomic rewrite (--save-in-place)
+    PERF_POLL_MS    = 500       # timing overlay refresh (profiling only)
+    WATCH_POLL_MS   = 1000      # check the open file for changes by other programs
+
+    def __init__(self):
+        super().__init__()
+        self.title("AFoP CamoColorPalette Editor | Made By: Jasper_Zebra | Version 1.0")
+        self.configure(bg=BG)
+        self.geometry("960x700")
+        self.minsize(700,400)
+
+        self.filepath         = None
+        self.workspace        = None    # Workspace when several files are open
+        self.store            = PaletteStore()
+        self.search           = SearchIndex()
+        self.color_index      = ColorIndex(self.store)
+        self._color_query     = None    # (html, threshold, k, fields) or None
+        self._filter_job      = None
+        self._loading         = None    # (queue, cancel Event) of the running load
+        self._saving          = None    # running save: (queue, path, store, edits snapshot),
+                                        # or per file [(file index, part, queue)] in a workspace
+        self._watch           = None    # FileState of the open file as last parsed
+        self._checking        = None    # (queue, store, FileState) of the running change check
+        self._comparing       = None    # queue of the running Compare load
+
+        self._build_ui()
+        self._try_autoload()
+        self.after(self.WATCH_POLL_MS, self._poll_watch)
+
+    def _build_ui(self):
+        style = ttk.Style(self)
+        style.theme_use("clam")
+        style.configure("Vertical.TScrollbar", background=OVERLAY,
+                        troughcolor=SURFACE, arrowcolor=TEXT)
+
+        tb = tk.Frame(self, bg=BG); tb.pack(fill="x", padx=10, pady=8)
+
+        def mkbtn(parent, text, cmd, fg=MAUVE, side="left"):
+            b = tk.Button(parent, text=text, command=cmd,
+                          bg=OVERLAY, fg=fg, activebackground="#45475a",
+                          activeforeground=fg, relief="flat",
+                          font=("Consolas",10,"bold"), padx=12, pady=4,
+                          cursor="hand2", bd=0)
+            b.pack(side=side, padx=(0,6)); return b
+
+        mkbtn(tb, "📂  Open", self._open_file)
+        mkbtn(tb, "🗂  Workspace", self._open_workspace)
+        mkbtn(tb, "🎨  Bulk", self._bulk)
+        mkbtn(tb, "⟲  Backups", self._backups)
+        mkbtn(tb, "⇄  Compare", self._compare)
+        self.lbl_file = tk.Label(tb, text="No file loaded", bg=BG,
+                                  fg=SUBTEXT, font=("Consolas",9))
+        self.lbl_file.pack(side="left", padx=6)
+        self.btn_save = mkbtn(tb, "💾  Save", self._save, GREEN, "right")
+        self.btn_save["state"] = "disabled"
+        self.btn_cancel = mkbtn(tb, "✗  Cancel", self._cancel_load, RED, "right")
+        self.btn_cancel.pack_forget()
+        self.lbl_progress = tk.Label(tb, text="", bg=BG, fg=SUBTEXT,
+                                      font=("Consolas",9))
+        self.lbl_progress.pack(side="right", padx=6)
+
+        sf = tk.Frame(self, bg=BG); sf.pack(fill="x", padx=10, pady=(0,4))
+        tk.Label(sf, text="🔍", bg=BG, fg=TEXT, font=("Consolas",11)).pack(side="left")
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *_: self._schedule_filter())
+        tk.Entry(sf, textvariable=self.search_var, bg=OVERLAY, fg=TEXT,
+                 insertbackground=TEXT, relief="flat",
+                 font=("Consolas",10), width=35).pack(side="left", padx=6, ipady=3)
+        mkbtn(sf, "🎯  Color", self._color_search)
+        self.btn_color = mkbtn(sf, "✗  Color", self._clear_color_search, RED)
+        self.btn_color.pack_forget()
+        self.lbl_count = tk.Label(sf, text="", bg=BG, fg=SUBTEXT,
+                                   font=("Consolas",9))
+        self.lbl_count.pack(side="left", padx=4)
+
+        self.table = ColorTable(self, on_edit_callback=lambda _: None,
+                                atlas=self.TABLE_ATLAS)
+        self.table.pack(fill="both", expand=True, padx=10, pady=(0,4))
+
+        tk.Label(self, text="Double-click a color cell to edit  ·  Alpha byte preserved automatically",
+                 bg=BG, fg=SUBTEXT, font=("Consolas",8)).pack(pady=(0,6))
+
+        if PROFILER.enabled:                    # live timing overlay
+            self.lbl_perf = tk.Label(self, text="", bg=SURFACE, fg=GREEN,
+                                     font=("Consolas",8), anchor="w")
+            self.lbl_perf.pack(fill="x", padx=10, pady=(0,6))
+            self.after(self.PERF_POLL_MS, self._poll_perf)
+
+    def _poll_perf(self):
+        last = PROFILER.last()
+        names = [t.partition(":")[2] for t in PROFILE_TARGETS]
+        parts = [f"{k.rpartition('.')[2].lstrip('_')} {last[k]:.1f}ms"
+                 for k in names if k in last]
+        parts.append(f"items {canvas_items(self)}")
+        self.lbl_perf.config(text="  ·  ".join(parts))
+        self.after(self.PERF_POLL_MS, self._poll_perf)
+
+    def _try_autoload(self):
+        default = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               "gearcamo_colorpalettes.rejuice")
+        if os.path.exists(default): self._load(default)
+
+    def _open_file(self):
+        path = filedialog.askopenfilename(
+            title="Open .rejuice file",
+            filetypes=[("Rejuice files","*.rejuice"),("All files","*.*")])
+        if path: self._load(path)
+
+    def _open_workspace(self):
+        paths = filedialog.askopenfilenames(
+            title="Open .rejuice files as a workspace",
+            filetypes=[("Rejuice files","*.rejuice"),("All files","*.*")])
+        if len(paths) == 1: self._load(paths[0])
+        elif paths: self._load_workspace(paths)
+
+    def _load(self, path):
+        """Parse on a worker thread; rows appear as batches arrive."""
+        self._cancel_load()
+        self.filepath         = path
+        self.workspace        = None
+        self._watch           = None
+        self.store            = PaletteStore()
+        self.search           = SearchIndex()
+        self._color_query     = None
+        self.btn_color.pack_forget()
+        self.lbl_file.config(text=os.path.basename(path), fg=TEXT)
+        self.btn_save["state"] = "disabled"
+        self.btn_cancel.pack(side="right", padx=(0,6))
+        self.table.load(self.store)
+        self._update_count()
+        out, cancel = queue.Queue(), threading.Event()
+        self._loading = (out, cancel)
+        threading.Thread(target=load_worker, args=(path, out, cancel),
+                         daemon=True).start()
+        self.after(self.LOAD_POLL_MS, self._poll_load, out)
+
+    def _load_workspace(self, paths):
+        """Parse several files concurrently into one table, sharing interned names."""
+        self._cancel_load()
+        self.filepath         = None
+        self.workspace        = None
+        self.store            = PaletteStore()
+        self.search           = SearchIndex()
+        self._color_query     = None
+        self.btn_color.pack_forget()
+        self.lbl_file.config(text=f"{len(paths)} files", fg=TEXT)
+        self.btn_save["state"] = "disabled"
+        self.btn_cancel.pack(side="right", padx=(0,6))
+        self.table.load(self.store)
+        self._update_count()
+        out, cancel = queue.Queue(), threading.Event()
+        self._loading = (out, cancel)
+        threading.Thread(target=workspace_worker, args=(paths, out, cancel),
+                         daemon=True).start()
+        self.after(self.LOAD_POLL_MS, self._poll_load, out)
+
+    def _poll_load(self, out):
+        if self._loading is None or self._loading[0] is not out:
+            return                                  # cancelled or superseded
+        got, status = False, None
+        try:
+            while True:
+                msg = out.get_nowait()
+                if msg[0] == "batch":
+                    _, entries, pos, size = msg
+                    for e in entries:
+                        self.store.append(e)
+                    self.search.add(e["name"] for e in entries)
+                    self.lbl_progress.config(
+                        text=f"Loading {pos/2**20:.1f} / {size/2**20:.1f} MB")
+                    got = True
+                elif msg[0] == "store":             # from the .idx sidecar
+                    self.store = msg[1]
+                    self.search.add(self.store.name(i) for i in range(len(self.store)))
+                    got = True
+                elif msg[0] == "workspace":
+                    self.workspace = msg[1]
+                    self.store     = self.workspace.store
+                    self.search.add(self.store.name(i) for i in range(len(self.store)))
+                    self.lbl_file.config(text=", ".join(self.workspace.labels))
+                    got = True
+                elif msg[0] == "progress":
+                    self.lbl_progress.config(text=f"Loading {msg[1]} / {msg[2]} files")
+                else:
+                    status = msg; break
+        except queue.Empty:
+            pass
+        if got:
+            self._filter()
+        if status is None:
+            self.after(self.LOAD_POLL_MS, self._poll_load, out)
+            return
+        self._finish_load()
+        if status[0] == "error":
+            self.filepath  = None
+            self.workspace = None
+            self.lbl_file.config(text="No file loaded", fg=SUBTEXT)
+            messagebox.showerror("Parse error", str(status[1]))
+        else:
+            self.btn_save["state"] = "normal"
+            if self.filepath:                       # workspaces are not watched
+                self._watch = status[1]
+
+    def _poll_watch(self):
+        """
+        Stat the open file; when another program changed it, hash and reparse
+        it on a worker thread (see _poll_check). Nothing is read here.
+        """
+        old = self._watch
+        if (old is not None and old.path == self.filepath and self._loading is None
+                and self._saving is None and self._checking is None
+                and not old.unchanged()):
+            out = queue.Queue()
+            self._checking = (out, self.store, old)
+            threading.Thread(target=watch_worker, args=(self.store, old, out),
+                             daemon=True).start()
+            self.after(self.LOAD_POLL_MS, self._poll_check)
+        self.after(self.WATCH_POLL_MS, self._poll_watch)
+
+    def _poll_check(self):
+        out, store, old = self._checking
+        if self.grab_current() is not None:     # a dialog is open: apply after it closes
+            self.after(self.LOAD_POLL_MS, self._poll_check); return
+        try:
+            msg = out.get_nowait()
+        except queue.Empty:
+            self.after(self.LOAD_POLL_MS, self._poll_check); return
+        self._checking = None
+        if store is not self.store or old is not self._watch:
+            return                                  # closed or reloaded meanwhile
+        if msg[0] == "same":                        # touched, not changed
+            self._watch = msg[1]
+        elif msg[0] == "changed":
+            self._reload_changed(*msg[1:])
+        elif msg[0] == "error":                     # unreadable: stop watching it
+            self._watch = None
+        # "busy": still being written, the next poll looks again
+
+    def _reload_changed(self, new, fresh, span):
+        """Swap in the reparsed store, carrying unsaved edits over and asking about conflicts."""
+        conflicts   = carry_edits(self.store, fresh, span)
+        self._watch = new
+        self.store  = fresh
+        self.search = SearchIndex(fresh.name(i) for i in range(len(fresh)))
+        self.lbl_file.config(text=f"{os.path.basename(self.filepath)}  "
+                                  f"(reloaded {time.strftime('%H:%M:%S')})")
+        self._filter()
+        if not conflicts:
+            return
+        hexs  = lambda v: "removed" if v is None else f"0x{v:08x}"
+        lines = [f"{name} · {FIELDS[fi]}: file {hexs(theirs)}, yours 0x{mine:08x}"
+                 for _, fi, name, _, mine, theirs in conflicts[:10]]
+        if len(conflicts) > 10:
+            lines.append(f"… and {len(conflicts) - 10} more")
+        keep = messagebox.askyesno("File changed on disk",
+            f"{os.path.basename(self.filepath)} was changed by another program, and "
+            f"{len(conflicts)} of your unsaved value(s) were changed there too:\n\n"
+            + "\n".join(lines) +
+            "\n\nKeep your values? No takes the file's. Values removed from the file "
+            "cannot be kept.")
+        if not keep:
+            for j, fi, _, _, _, theirs in conflicts:
+                if j is not None:
+                    fresh.set(j, fi, theirs)
+        self.table.refresh()
+
+    def _cancel_load(self):
+        if self._loading is None:
+            return
+        self._loading[1].set()
+        self._finish_load()
+        self.filepath         = None
+        self.workspace        = None
+        self._watch           = None
+        self.store            = PaletteStore()
+        self.search           = SearchIndex()
+        self.lbl_file.config(text="No file loaded", fg=SUBTEXT)
+        self._filter()
+
+    def _finish_load(self):
+        self._loading = None
+        self.btn_cancel.pack_forget()
+        self.lbl_progress.config(text="")
+
+    def _update_count(self, shown=None):
+        total = len(self.store)
+        shown = total if shown is None else shown
+        self.lbl_count.config(
+            text=f"{shown} / {total} entries" if shown!=total else f"{total} entries")
+
+    def _schedule_filter(self):
+        """Debounce keystrokes so a burst of typing filters once."""
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(self.SEARCH_DELAY_MS, self._filter)
+
+    def _filter(self):
+        self._filter_job = None
+        vis = self.search.query(self.search_var.get().lower())
+        if self._color_query is not None:       # nearest first, within the name hits
+            if self.color_index.store is not self.store:
+                self.color_index = ColorIndex(self.store)
+            html, threshold, k, fields = self._color_query
+            named = set(vis)
+            vis = [i for i in self.color_index.entries(html, threshold, k, fields)
+                   if i in named]
+        self.table.load(self.store, vis,
+                        source=self.workspace.label if self.workspace else None)
+        self._update_count(len(vis))
+
+    def _color_search(self):
+        if not len(self.store) or self._loading is not None: return
+        dlg = ColorQueryDialog(self, self._color_query[0] if self._color_query else "#808080")
+        self.wait_window(dlg)
+        if dlg.result is None: return
+        self._color_query = dlg.result
+        self.btn_color.pack(side="left", padx=(0,6), before=self.lbl_count)
+        self._filter()
+
+    def _clear_color_search(self):
+        self._color_query = None
+        self.btn_color.pack_forget()
+        self._filter()
+
+    def _bulk(self):
+        if not len(self.store) or self._loading is not None: return
+        dlg = BulkDialog(self, len(self.table.visible))
+        self.wait_window(dlg)
+        if dlg.result is None: return
+        op, fields, params = dlg.result
+        changed = bulk_transform(self.store, self.table.visible, fields, op, **params)
+        self.table.refresh()
+        messagebox.showinfo("Bulk edit", f"{changed} value(s) changed.")
+
+    def _backups(self):
+        if not self.filepath or self._loading is not None or self._saving is not None:
+            return
+        gens = BackupLog(self.filepath).generations()
+        if not gens:
+            messagebox.showinfo("Backups", "No backups yet – they are made on Save."); return
+        dlg = BackupDialog(self, gens)
+        self.wait_window(dlg)
+        if dlg.result is None: return
+        if self.store.dirty and not messagebox.askyesno("Restore backup",
+                "Restoring discards your unsaved changes. Continue?"):
+            return
+        try:
+            BackupLog(self.filepath).restore(dlg.result)
+        except Exception as e:
+            messagebox.showerror("Restore error", str(e)); return
+        self._load(self.filepath)
+
+    def _compare(self):
+        """
+        Parse the other file on a worker thread into a store of its own (its
+        names stay out of the open store's NameTable, and no .idx is written
+        next to a file that is only looked at); _poll_compare shows the diff.
+        """
+        if not self.filepath or self._loading is not None or self._comparing is not None:
+            return
+        path = filedialog.askopenfilename(
+            title="Compare with…",
+            filetypes=[("Rejuice files","*.rejuice"),("All files","*.*")])
+        if not path: return
+        out = self._comparing = queue.Queue()
+        self.lbl_progress.config(text=f"Reading {os.path.basename(path)}…")
+        threading.Thread(target=load_worker, args=(path, out, threading.Event()),
+                         kwargs={"use_index": False}, daemon=True).start()
+        self.after(self.LOAD_POLL_MS, self._poll_compare, out, path, PaletteStore(), self.store)
+
+    def _poll_compare(self, out, path, other, store):
+        try:
+            while True:
+                msg = out.get_nowait()
+                if msg[0] != "batch":
+                    break
+                for e in msg[1]:
+                    other.append(e)
+        except queue.Empty:
+            self.after(self.LOAD_POLL_MS, self._poll_compare, out, path, other, store)
+            return
+        self._comparing = None
+        if self._loading is None and self._saving is None:
+            self.lbl_progress.config(text="")
+        if msg[0] == "error":
+            messagebox.showerror("Compare", str(msg[1])); return
+        if store is not self.store:
+            return                                  # closed or reloaded meanwhile
+        DiffView(self, os.path.basename(self.filepath), os.path.basename(path),
+                 diff_stores(store, other), take=lambda rows: self._take_values(rows, store))
+
+    def _take_values(self, rows, store):
+        if store is not self.store:             # reloaded or replaced since the compare
+            messagebox.showwarning("Compare", "The file was reloaded – compare again.")
+            return
+        for _, ia, _, fi, _, new in rows:
+            self.store.set(ia, fi, new)
+        self.table.refresh()
+        messagebox.showinfo("Compare", f"{len(rows)} value(s) taken – Save to write them.")
+
+    def _save(self):
+        """Write on a background thread; completion comes back through _poll_save."""
+        if self.workspace is not None and self._saving is None:
+            return self._save_workspace()
+        if not self.filepath or self._saving is not None: return
+        if self._checking is not None:              # let a running change check land first
+            self.after(self.LOAD_POLL_MS, self._save); return
+        out, edits = queue.Queue(), dict(self.store.edits)
+        self._saving = (out, self.filepath, self.store, edits)
+        self.btn_save["state"] = "disabled"
+        self.lbl_progress.config(text="Saving…")
+        threading.Thread(target=save_worker, daemon=True,
+                         args=(self.filepath, self.store, edits, out, True,
+                               self.SAVE_IN_PLACE, True)).start()
+        self.after(self.LOAD_POLL_MS, self._poll_save)
+
+    def _poll_save(self):
+        out, path, store, edits = self._saving
+        try:
+            msg = out.get_nowait()
+        except queue.Empty:
+            self.after(self.LOAD_POLL_MS, self._poll_save); return
+        self._saving = None
+        self.lbl_progress.config(text="")
+        if self.filepath == path and self._loading is None:
+            self.btn_save["state"] = "normal"
+        if msg[0] == "error":
+            messagebox.showerror("Save error", str(msg[1])); return
+        store.commit(msg[1])
+        if path == self.filepath and store is self.store:
+            self._watch = msg[2]
+        written = {p[3] for p in msg[1]}
+        missed  = [slot for slot in sorted(edits) if slot not in written]
+        if missed:
+            messagebox.showwarning("Saved with problems",
+                f"{len(missed)} value(s) could not be found in the file and were "
+                f"not written, e.g. {store.name(missed[0] // 3)} · "
+                f"{FIELDS[missed[0] % 3]}.")
+            return
+        messagebox.showinfo("Saved ✓",
+            f"Saved.\nBackups: {os.path.basename(path)}.bak + .bakdelta")
+
+    def _save_workspace(self):
+        """Save each workspace file that has edits on its own thread; clean files are left alone."""
+        ws   = self.workspace
+        jobs = []
+        for k in ws.dirty_files():
+            part, out = ws.part(k), queue.Queue()
+            jobs.append((k, part, out))
+            threading.Thread(target=save_worker, daemon=True,
+                             args=(ws.paths[k], part, dict(part.edits), out, True,
+                                   self.SAVE_IN_PLACE)).start()
+        if not jobs:
+            messagebox.showinfo("Save", "No file has unsaved changes."); return
+        self._saving = jobs
+        self.btn_save["state"] = "disabled"
+        self.lbl_progress.config(text=f"Saving {len(jobs)} file(s)…")
+        self.after(self.LOAD_POLL_MS, self._poll_save_workspace, ws, jobs, [], [])
+
+    def _poll_save_workspace(self, ws, pending, saved, problems):
+        waiting = []
+        for k, part, out in pending:
+            try:
+                msg = out.get_nowait()
+            except queue.Empty:
+                waiting.append((k, part, out)); continue
+            if msg[0] == "error":
+                problems.append(f"{ws.labels[k]}: {msg[1]}"); continue
+            ws.commit(k, part, msg[1])
+            saved.append(ws.labels[k])
+            if part.edits:
+                slot = min(part.edits)
+                problems.append(f"{ws.labels[k]}: {len(part.edits)} value(s) could not be "
+                                f"found, e.g. {part.name(slot // 3)} · {FIELDS[slot % 3]}")
+        if waiting:
+            self.after(self.LOAD_POLL_MS, self._poll_save_workspace, ws, waiting, saved, problems)
+            return
+        self._saving = None
+        self.lbl_progress.config(text="")
+        if self.workspace is ws and self._loading is None:
+            self.btn_save["state"] = "normal"
+        if problems:
+            messagebox.showwarning("Saved with problems", "\n".join(problems)); return
+        messagebox.showinfo("Saved ✓", "Saved " + ", ".join(saved) + " (with .bak backups).")
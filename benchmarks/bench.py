@@ -0,0 +1,285 @@
+"""
+Hot-path benchmarks for afop_palette_editor
+============================================
+Generates a synthetic .rejuice (see gen_rejuice.py), times every hot path
+and prints / writes the results as JSON. With --baseline the run is compared
+against an earlier JSON and exits 1 if any benchmark got slower than
+--threshold (0.20 = 20 %).
+
+    python benchmarks/bench.py --entries 20000 --out new.json
+    python benchmarks/bench.py --baseline old.json --threshold 0.2
+
+Importing afop_core is timed in fresh interpreters and must stay under
+--import-budget without loading tkinter or NumPy.
+
+Tk benchmarks (picker redraws, table redraw, search filter) need a display;
+run under Xvfb (xvfb-run python benchmarks/bench.py) on headless machines.
+They are reported as skipped when Tk cannot start.
+"""
+
+import argparse, json, os, platform, shutil, statistics, subprocess, sys, tempfile, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+import afop_core as afop
+from afop_core._lazy import numpy
+from gen_rejuice import write_rejuice
+
+
+def timeit(fn, repeat, setup=None):
+    """Run fn repeat times (setup untimed before each) -> {min, median, runs} in s."""
+    runs = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        t = time.perf_counter()
+        fn(arg) if setup else fn()
+        runs.append(time.perf_counter() - t)
+    return {"min": min(runs), "median": statistics.median(runs), "runs": repeat}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  CORE (no Tk)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def bench_core(path, repeat, tmp):
+    res  = {}
+    res["parse_rejuice"]      = timeit(lambda: afop.parse_rejuice(path), repeat)
+    res["store_load"]         = timeit(lambda: afop.PaletteStore.load(path, use_index=False), repeat)
+    copies = [os.path.join(tmp, f"ws{k}.rejuice") for k in range(4)]
+    for c in copies:
+        shutil.copyfile(path, c)
+    res["workspace_load_4"]   = timeit(lambda: afop.Workspace.load(copies, use_index=False), repeat)
+    store = afop.PaletteStore.load(path, use_index=False)
+    afop.write_index(path, store)
+    res["store_load_index"]   = timeit(lambda: afop.PaletteStore.load(path, use_index=True), repeat)
+    os.remove(path + afop.INDEX_SUFFIX)
+
+    # save: one edited value vs every present value edited
+    slots = [(i, fi) for i in range(len(store)) for fi in range(3) if store.has(i, fi)]
+    work  = os.path.join(tmp, "save.rejuice")
+
+    def edited(which):
+        def setup():
+            shutil.copyfile(path, work)
+            s = afop.PaletteStore.load(work, use_index=False)
+            for i, fi in which:
+                s.set(i, fi, s.value(i, fi) ^ 0x00010101)
+            return s
+        return setup
+    for label, which in (("1", slots[:1]), ("all", slots)):
+        for mode, in_place in (("atomic", False), ("inplace", True)):
+            res[f"save_{label}_{mode}"] = timeit(
+                lambda s, ip=in_place: afop.save_rejuice(work, s, backup=False,
+                                                         in_place=ip, use_index=False),
+                repeat, edited(which))
+
+    # outside change to one value in the middle: reparse the changed chunk only
+    with open(path, "rb") as f:
+        data = f.read()
+    old   = afop.FileState.capture(path)
+    pos   = store.offsets[slots[len(slots) // 2][0]*3 + slots[len(slots) // 2][1]]
+    data2 = data[:pos] + b"0x12345678" + data[pos + 10:]
+    new   = afop.FileState(path, data2, (len(data2), 0))
+    res["file_state_capture"] = timeit(lambda: afop.FileState.capture(path), repeat)
+    res["reparse_changed"]    = timeit(lambda: afop.reparse_changed(store, old, new, data2), repeat)
+
+    hexes = [store.text(i, fi) for i, fi in slots[:20000]]
+    rgbs  = [afop.hex_str_to_rgb(h) for h in hexes]
+    res["hex_str_to_rgb"] = timeit(lambda: [afop.hex_str_to_rgb(h) for h in hexes], repeat)
+    res["rgb_to_hex_str"] = timeit(
+        lambda: [afop.rgb_to_hex_str(html, a) for html, a in rgbs], repeat)
+
+    res["sv_gradient_ppm"] = timeit(lambda: afop.sv_gradient_ppm(0.3, 450, 220), repeat)
+    res["hue_bar_ppm"]     = timeit(lambda: afop.hue_bar_ppm(450, 22), repeat)
+    band = [tuple(store.value(i, fi) for fi in range(3)) for i in range(afop.ATLAS_ROWS)]
+    res["table_band_ppm"]  = timeit(lambda: afop.table_band_ppm(0, band), repeat)
+
+    idx = afop.SearchIndex(store.name(i) for i in range(len(store)))
+    res["search_query"] = timeit(
+        lambda: [idx.query(q) for q in ("r", "re", "res", "res_camo_00", "zzz", "")], repeat)
+
+    ci = afop.ColorIndex(store)
+    res["color_index_build"] = timeit(lambda: (setattr(ci, "_base", None), ci._sync()), repeat)
+    res["color_query"] = timeit(
+        lambda: [ci.query(c, threshold=10) + ci.query(c, k=50)
+                 for c in ("#3a6b2f", "#808080", "#d0c090")], repeat)
+    return res
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  IMPORT TIME
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_IMPORT_PROBE = (
+    "import sys, time\n"
+    "t = time.perf_counter()\n"
+    "import afop_core\n"
+    "t = time.perf_counter() - t\n"
+    "heavy = sorted(m for m in ('tkinter', 'numpy') if m in sys.modules)\n"
+    "print(t, ','.join(heavy))\n"
+)
+
+
+def bench_import(repeat):
+    """Cold 'import afop_core' in fresh interpreters; also checks no Tk / NumPy is loaded."""
+    runs, heavy = [], ""
+    for _ in range(repeat + 1):             # first run may write __pycache__
+        out = subprocess.run([sys.executable, "-c", _IMPORT_PROBE], cwd=ROOT, check=True,
+                             capture_output=True, text=True).stdout.split()
+        runs.append(float(out[0]))
+        heavy = out[1] if len(out) > 1 else heavy
+    runs = runs[1:]
+    return {"min": min(runs), "median": statistics.median(runs), "runs": repeat}, heavy
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  TK (needs a display)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def bench_tk(path, repeat):
+    try:
+        import afop_gui
+        app = afop_gui.App()
+    except ImportError as e:
+        return {}, f"no tkinter ({e})"
+    except afop_gui.tk.TclError as e:
+        return {}, f"no display ({e})"
+    try:
+        app.withdraw()
+        app.store  = afop.PaletteStore.load(path, use_index=False)
+        app.search = afop.SearchIndex(app.store.name(i) for i in range(len(app.store)))
+        app.table.load(app.store)
+        app.update()
+        res = {}
+
+        def do_filter():
+            for q in ("r", "re", "res", "res_camo_00", ""):
+                app.search_var.set(q)
+                app._filter()
+                app.update_idletasks()
+        res["app_filter"]    = timeit(do_filter, repeat)
+        res["table_redraw"]  = timeit(lambda: (app.table._redraw(), app.update_idletasks()), repeat)
+        atlas = afop_gui.ColorTable(app, lambda _: None, atlas=True)
+        atlas.pack(fill="both", expand=True)
+        atlas.load(app.store)
+        app.update()
+        res["table_redraw_atlas"] = timeit(lambda: (atlas._redraw(), app.update_idletasks()), repeat)
+        atlas.destroy()
+
+        pk = afop_gui.ColorPicker(app, "#3a7bd5", cache=afop_gui.ImageCache())
+        pk.update()
+
+        def sq_cold():                      # new hue every call: gradient rebuilt
+            pk._cache.clear(); pk._sq_key = None
+            pk._h = (pk._h + 0.37) % 1.0
+            pk._redraw_sq(); pk.update_idletasks()
+
+        def sq_drag():                      # same hue: crosshair only
+            pk._s = (pk._s + 0.01) % 1.0
+            pk._redraw_sq(); pk.update_idletasks()
+
+        def hue_cold():
+            pk._cache.clear(); pk._hue_key = None
+            pk._redraw_hue(); pk.update_idletasks()
+        res["picker_redraw_sq_cold"]  = timeit(sq_cold, repeat)
+        res["picker_redraw_sq_drag"]  = timeit(sq_drag, repeat)
+        res["picker_redraw_hue_cold"] = timeit(hue_cold, repeat)
+        pk.destroy()
+        return res, None
+    finally:
+        app.destroy()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  COMPARE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def compare(new, old, threshold):
+    """Return [(name, old_min, new_min, ratio)] for benchmarks over threshold."""
+    worse = []
+    for name, r in new["results"].items():
+        o = old.get("results", {}).get(name)
+        if not o or o["min"] <= 0:
+            continue
+        ratio = r["min"] / o["min"]
+        if ratio > 1 + threshold:
+            worse.append((name, o["min"], r["min"], ratio))
+    return worse
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--entries", type=int, default=20000)
+    ap.add_argument("--missing", type=float, default=0.2)
+    ap.add_argument("--filler", type=int, default=4)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--file", help="benchmark this .rejuice instead of a synthetic one")
+    ap.add_argument("--no-tk", action="store_true", help="skip the Tk benchmarks")
+    ap.add_argument("--out", help="write the JSON results here")
+    ap.add_argument("--baseline", help="earlier JSON results to compare against")
+    ap.add_argument("--threshold", type=float, default=0.20)
+    ap.add_argument("--import-budget", type=float, default=0.100,
+                    help="fail if importing afop_core takes longer (seconds, default 0.1)")
+    a = ap.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="afop-bench-")
+    try:
+        path = os.path.join(tmp, "bench.rejuice")
+        if a.file:
+            shutil.copyfile(a.file, path)
+        else:
+            write_rejuice(path, a.entries, a.missing, a.filler)
+        results = {}
+        results["import_core"], heavy = bench_import(a.repeat)
+        results.update(bench_core(path, a.repeat, tmp))
+        skipped = "--no-tk" if a.no_tk else None
+        if not a.no_tk:
+            tk_res, skipped = bench_tk(path, a.repeat)
+            results.update(tk_res)
+        report = {
+            "meta": {
+                "python":  platform.python_version(),
+                "numpy":   numpy().__version__ if numpy() is not None else None,
+                "machine": platform.machine(),
+                "file":    a.file or "synthetic",
+                "entries": len(afop.PaletteStore.load(path, use_index=False)),
+                "bytes":   os.path.getsize(path),
+                "repeat":  a.repeat,
+                "tk_skipped": skipped,
+                "import_budget": a.import_budget,
+            },
+            "results": results,
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if a.out:
+        with open(a.out, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    if skipped:
+        print(f"Tk benchmarks skipped: {skipped}", file=sys.stderr)
+    failed = False
+    if heavy:
+        print(f"IMPORT afop_core pulled in {heavy}", file=sys.stderr); failed = True
+    if results["import_core"]["min"] > a.import_budget:
+        print(f"IMPORT afop_core took {results['import_core']['min']*1e3:.1f} ms "
+              f"(budget {a.import_budget*1e3:.0f} ms)", file=sys.stderr); failed = True
+
+    if a.baseline:
+        with open(a.baseline) as f:
+            worse = compare(report, json.load(f), a.threshold)
+        for name, o, n, ratio in worse:
+            print(f"REGRESSION {name}: {o*1e3:.2f} ms -> {n*1e3:.2f} ms ({ratio:.2f}x)",
+                  file=sys.stderr)
+        if worse:
+            return 1
+        print(f"No regressions over {a.threshold:.0%}.", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Synthetic .rejuice generator for the benchmarks
+================================================
+Writes files shaped like gearcamo_colorpalettes.rejuice: NUL-delimited
+tokens, one GearCamoColorPalette block per entry, filler tokens between
+the color fields and some fields left out.
+
+    python benchmarks/gen_rejuice.py out.rejuice --entries 20000 --missing 0.2
+"""
+
+import argparse, random
+
+FIELDS = ("myPrimaryColor", "mySecondaryColor", "myTertiaryColor")
+PREFIXES = ("res", "vlt", "rda", "sky", "nav", "tlc", "kam", "ikn")
+FILLER = (b"CamoColorPaletteType", b"myTemplate", b"0", b"1", b" ", b"",
+          b"Gear.Camo.Palette", b"myHash")
+
+
+def write_rejuice(path, entries, missing=0.2, filler=4, seed=0):
+    """
+    entries  – number of GearCamoColorPalette blocks
+    missing  – chance that each color field is left out (shows as "—")
+    filler   – filler tokens between fields (0..filler per gap, avg filler/2)
+    Returns the file size in bytes.
+    """
+    r   = random.Random(seed)
+    out = [b"rejuice\x00version\x002\x00GearCamoColorPalettes\x00\x00"]
+    for i in range(entries):
+        name = f"{r.choice(PREFIXES)}_camo_{i:06d}".encode()
+        out += [b"GearCamoColorPalette\x00", name, b"\x00"]
+        for field in FIELDS:
+            out += [r.choice(FILLER) + b"\x00" for _ in range(r.randint(0, filler))]
+            if r.random() >= missing:
+                out += [field.encode(), b"\x00", b"0x%08x" % r.getrandbits(32), b"\x00"]
+    data = b"".join(out)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("path")
+    ap.add_argument("--entries", type=int, default=5000)
+    ap.add_argument("--missing", type=float, default=0.2)
+    ap.add_argument("--filler", type=int, default=4)
+    ap.add_argument("--seed", type=int, default=0)
+    a = ap.parse_args()
+    size = write_rejuice(a.path, a.entries, a.missing, a.filler, a.seed)
+    print(f"wrote {a.path}: {a.entries} entries, {size} bytes")
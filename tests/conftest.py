@@ -0,0 +1,36 @@
+import os, random, re, sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+from gen_rejuice import write_rejuice   # noqa: E402  (needs the path above)
+
+_VALUE_RE = re.compile(rb"(?<=\x00)0x([0-9a-f]{8})(?=\x00)")
+
+
+@pytest.fixture
+def make_rejuice(tmp_path):
+    """
+    make_rejuice(entries, seed=0, odd_widths=0.0, name="p.rejuice", **kw) writes
+    a generated .rejuice into tmp_path and returns its path. odd_widths is the
+    share of values rewritten at another byte width ('0xff', '0x0000000000ff'),
+    so saving '0x%08x' over them moves everything after.
+    """
+    def make(entries, seed=0, odd_widths=0.0, name="p.rejuice", **kw):
+        path = str(tmp_path / name)
+        write_rejuice(path, entries, seed=seed, **kw)
+        if odd_widths:
+            r = random.Random(seed)
+            def width(m):
+                if r.random() >= odd_widths:
+                    return m.group(0)
+                v = int(m.group(1), 16)
+                return b"0x%x" % v if r.random() < 0.5 else b"0x%012x" % v
+            with open(path, "rb") as f:
+                data = _VALUE_RE.sub(width, f.read())
+            with open(path, "wb") as f:
+                f.write(data)
+        return path
+    return make
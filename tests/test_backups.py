@@ -0,0 +1,80 @@
+"""
+Backup generations: every generation restores byte-exactly, including after
+old deltas were folded into the .bak snapshot.
+"""
+
+import os, random, shutil
+
+import pytest
+
+from afop_core import BackupLog, PaletteStore, write_patches
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def save(path, store, r, keep):
+    """One editor save of a few random values, logged with keep generations."""
+    slots = [s for s in range(len(store) * 3) if store.widths[s]]
+    for slot in r.sample(slots, r.randint(1, 20)):
+        store.set(slot // 3, slot % 3, r.getrandbits(32))
+    backups = BackupLog(path, keep)
+    backups.prepare()
+    patches = write_patches(path, store)
+    backups.record(patches)
+    store.commit(patches)
+
+
+def copy_with_backups(path, folder):
+    os.mkdir(folder)
+    for suffix in ("", ".bak", ".bakdelta"):
+        shutil.copy2(path + suffix, os.path.join(folder, os.path.basename(path) + suffix))
+    return os.path.join(folder, os.path.basename(path))
+
+
+@pytest.mark.parametrize("odd_widths", (0.0, 0.3))        # same-width folds mmap, others rewrite
+@pytest.mark.parametrize("seed", range(4))
+def test_restore_every_generation(make_rejuice, tmp_path, seed, odd_widths):
+    keep, saves = 3, 7
+    path  = make_rejuice(300, seed=seed, odd_widths=odd_widths)
+    store = PaletteStore.load(path, use_index=False)
+    r     = random.Random(seed)
+    snaps = [read(path)]
+    for _ in range(saves):
+        save(path, store, r, keep)
+        snaps.append(read(path))
+    gens = BackupLog(path, keep).generations()
+    assert [g for g, _, _ in gens] == list(range(keep + 1))
+    first = saves - keep                    # snapshot the folded .bak now holds
+    assert read(path + ".bak") == snaps[first]
+    for g in range(keep + 1):
+        copy = copy_with_backups(path, str(tmp_path / f"gen{g}"))
+        backups = BackupLog(copy, keep)
+        backups.restore(g)
+        assert read(copy) == snaps[first + g]
+        if g < keep and not odd_widths:
+            # logged as one more generation: the previous tip is still restorable
+            backups.restore(len(backups.generations()) - 2)
+            assert read(copy) == snaps[-1]
+
+
+def test_outside_change_takes_a_new_snapshot(make_rejuice):
+    path  = make_rejuice(100, seed=5)
+    store = PaletteStore.load(path, use_index=False)
+    r     = random.Random(5)
+    save(path, store, r, 10); save(path, store, r, 10)
+    with open(path, "ab") as f:                 # another tool appends to the file
+        f.write(b"GearCamoColorPalette\x00extra\x00")
+    changed = read(path)
+    store = PaletteStore.load(path, use_index=False)
+    save(path, store, r, 10)
+    backups = BackupLog(path, 10)
+    assert len(backups.generations()) == 2
+    after = read(path)
+    backups.restore(0)
+    assert read(path) == changed
+    assert len(backups.generations()) == 3      # the restore is logged as generation 2
+    backups.restore(1)
+    assert read(path) == after
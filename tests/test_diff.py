@@ -0,0 +1,68 @@
+"""
+Three-way merge: the merged file holds, per value, theirs where only they
+changed it, ours otherwise, and conflicts settled as --prefer says.
+"""
+
+import os, random, shutil
+
+import pytest
+
+from afop_core import PaletteStore, diff_stores, merge_stores, save_rejuice
+from afop_core.cli import main
+
+
+def parsed(path):
+    return PaletteStore.load(path, use_index=False)
+
+
+def edited_copy(base, path, slots, values):
+    shutil.copyfile(base, path)
+    store = parsed(path)
+    for slot in slots:
+        store.set(slot // 3, slot % 3, values[slot])
+    save_rejuice(path, store, backup=False, use_index=False)
+    return path
+
+
+@pytest.mark.parametrize("prefer", (None, "ours", "theirs"))
+@pytest.mark.parametrize("seed", range(5))
+def test_merge_round_trip(make_rejuice, tmp_path, seed, prefer):
+    base  = make_rejuice(400, seed=seed, name="base.rejuice")
+    store = parsed(base)
+    r     = random.Random(seed)
+    slots = [s for s in range(len(store) * 3) if store.widths[s]]
+    mine, theirs_only, both = (set(r.sample(slots, 80)) for _ in range(3))
+    same = set(r.sample(sorted(both), 20))              # both sides made the same change
+    ours_v   = {s: r.getrandbits(32) for s in mine | both}
+    theirs_v = {s: ours_v[s] if s in same else r.getrandbits(32) for s in theirs_only | both}
+    ours   = edited_copy(base, str(tmp_path / "ours.rejuice"), mine | both, ours_v)
+    theirs = edited_copy(base, str(tmp_path / "theirs.rejuice"), theirs_only | both, theirs_v)
+    with open(theirs, "ab") as f:
+        f.write(b"GearCamoColorPalette\x00only_theirs\x00myPrimaryColor\x000x01020304\x00")
+
+    b, o, t = parsed(base), parsed(ours), parsed(theirs)
+    merge = merge_stores(b, o, t, prefer)
+    save_rejuice(ours, o, backup=False, use_index=False)
+    merged = parsed(ours)
+
+    conflicts = {s for s in theirs_v if s in ours_v and ours_v[s] != theirs_v[s]}
+    for s in slots:
+        want = store.colors[s]
+        if s in ours_v:
+            want = ours_v[s]
+        if s in theirs_v and (s not in ours_v or s in conflicts and prefer == "theirs"):
+            want = theirs_v[s]
+        assert merged.value(s // 3, s % 3) == want
+    assert {(k[0], fi) for k, fi, *_ in merge["conflicts"]} == \
+           {(store.name(s // 3), s % 3) for s in conflicts if store.colors[s] != theirs_v[s]}
+    assert merge["skipped"] == [(("only_theirs", 0), None, "entry added in theirs")]
+    assert not diff_stores(merged, o)["changed"]
+
+
+def test_merge_output_exists_with_nothing_to_merge(make_rejuice, tmp_path, capsys):
+    base = make_rejuice(50, seed=1)
+    out  = str(tmp_path / "out.rejuice")
+    assert main(["merge", base, base, base, "-o", out, "--no-index"]) == 0
+    with open(base, "rb") as a, open(out, "rb") as b:
+        assert a.read() == b.read()
+    assert not os.path.exists(out + ".bak")
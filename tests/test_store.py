@@ -0,0 +1,63 @@
+"""
+Saving: patches land at the recorded offsets, and committing them (with
+values that change byte width) leaves the store equal to a fresh parse.
+"""
+
+import random
+
+import pytest
+
+from afop_core import PaletteStore, save_rejuice, write_patches
+
+
+def columns(store):
+    return ([store.name(i) for i in range(len(store))], store.colors.tolist(),
+            bytes(store.widths), store.offsets.tolist(), store.blocks.tolist())
+
+
+def parsed(path):
+    return PaletteStore.load(path, use_index=False)
+
+
+def edit_some(store, r, n):
+    slots = [s for s in range(len(store) * 3) if store.widths[s]]
+    for slot in r.sample(slots, n):
+        store.set(slot // 3, slot % 3, r.getrandbits(32))
+    return dict(store.edits)
+
+
+@pytest.mark.parametrize("in_place", (False, True))
+@pytest.mark.parametrize("seed", range(6))
+def test_save_matches_fresh_parse(make_rejuice, seed, in_place):
+    path  = make_rejuice(800, seed=seed, odd_widths=0.3)
+    store = parsed(path)
+    r     = random.Random(seed)
+    for round in range(3):              # later rounds patch at offsets the commits moved
+        edits   = edit_some(store, r, 60)
+        patches = save_rejuice(path, store, backup=False, in_place=in_place, use_index=False)
+        assert sorted(p[3] for p in patches) == sorted(edits) and not store.edits
+        if round == 0:
+            assert any(len(old) != len(new) for _, old, new, _ in patches)
+        fresh = parsed(path)
+        assert columns(fresh) == columns(store)
+        assert all(fresh.value(s // 3, s % 3) == v for s, v in edits.items())
+
+
+def test_atomic_and_in_place_write_the_same_bytes(make_rejuice, tmp_path):
+    a = make_rejuice(500, seed=3, name="a.rejuice")
+    b = make_rejuice(500, seed=3, name="b.rejuice")
+    sa, sb = parsed(a), parsed(b)
+    edit_some(sa, random.Random(1), 100); edit_some(sb, random.Random(1), 100)
+    write_patches(a, sa); write_patches(b, sb, in_place=True)
+    with open(a, "rb") as fa, open(b, "rb") as fb:
+        assert fa.read() == fb.read()
+
+
+def test_edit_after_patches_stays_pending(make_rejuice):
+    path  = make_rejuice(100, seed=2, missing=0)
+    store = parsed(path)
+    store.set(0, 0, 0x11111111)
+    patches = write_patches(path, store)
+    store.set(0, 0, 0x22222222)         # made while a background save ran
+    store.commit(patches)
+    assert store.original(0, 0) == 0x11111111 and store.edits == {0: 0x22222222}
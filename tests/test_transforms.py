@@ -0,0 +1,35 @@
+"""
+Bulk transforms: every result must be a 32-bit ARGB value with the alpha kept.
+"""
+
+import pytest
+
+from afop_core import PaletteStore, bulk_transform
+from gen_rejuice import write_rejuice
+
+PARAMS = [("hue", dict(degrees=-270)), ("satval", dict(sat=3.0, val=-1.0)),
+          ("tint", dict(color="#ff0000", amount=-0.5)),
+          ("tint", dict(color="#00ff80", amount=1.7)),
+          ("remap", dict(source="#808080", target="#ffffff", distance=400))]
+
+
+@pytest.mark.parametrize("op, params", PARAMS)
+def test_bulk_stays_in_range(tmp_path, op, params):
+    path = str(tmp_path / "p.rejuice")
+    write_rejuice(path, 300)
+    store = PaletteStore.load(path, use_index=False)
+    assert bulk_transform(store, range(len(store)), range(3), op, **params)
+    for slot, v in store.edits.items():
+        assert 0 <= v <= 0xFFFFFFFF
+        assert v >> 24 == store.colors[slot] >> 24
+        assert store.text(slot // 3, slot % 3) == f"0x{v:08x}"
+
+
+def test_set_rejects_out_of_range(tmp_path):
+    path = str(tmp_path / "p.rejuice")
+    write_rejuice(path, 10, missing=0)
+    store = PaletteStore.load(path, use_index=False)
+    for bad in (-56, 0x100000000):
+        with pytest.raises(ValueError):
+            store.set(0, 0, bad)
+    assert not store.edits
@@ -0,0 +1,162 @@
+"""
+Incremental reparse after an outside change, and carrying unsaved edits
+across it: the reparsed store must equal a full parse of the new file.
+"""
+
+import os, queue, random
+
+import pytest
+
+from afop_core import (MARKER, FileState, PaletteStore, carry_edits,
+                       reparse_changed, watch_worker)
+from gen_rejuice import write_rejuice
+
+
+def columns(store):
+    return ([store.name(i) for i in range(len(store))], store.colors.tolist(),
+            bytes(store.widths), store.offsets.tolist(), store.blocks.tolist())
+
+
+def entry(name, **colors):
+    out = MARKER + "\x00" + name + "\x00"
+    for field, value in colors.items():
+        out += field + "\x00" + value + "\x00"
+    return out.encode("latin-1")
+
+
+def rewrite(path, data):
+    """Write data over path and make sure its mtime moves on coarse clocks."""
+    st = os.stat(path)
+    with open(path, "wb") as f:
+        f.write(data)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def load(path):
+    store = PaletteStore.load(path, use_index=False)
+    return store, FileState.capture(path)
+
+
+def reparse(path, store, old, data):
+    rewrite(path, data)
+    new = FileState.capture(path)
+    fresh, span = reparse_changed(store, old, new, data)
+    return fresh, span, new
+
+
+def mutate(data, kind, r):
+    d, pos = bytearray(data), r.randrange(len(data))
+    if kind == "byte":
+        d[pos:pos + 1] = b"\x00"
+    elif kind == "insert-token":
+        d[pos:pos] = b"0x11223344\x00"
+    elif kind == "delete":
+        del d[pos:pos + r.randrange(1, 20000)]
+    elif kind == "recolor":
+        v = d.find(b"0x", pos)
+        d[v:v + 10] = b"0xdeadbeef"
+    elif kind == "insert-entry":
+        d[pos:pos] = entry("newpal", myPrimaryColor="0x01020304")
+    elif kind == "truncate":
+        del d[pos:]
+    return bytes(d)
+
+
+KINDS = ("byte", "insert-token", "delete", "recolor", "insert-entry", "truncate")
+
+
+@pytest.mark.parametrize("kind", KINDS)
+@pytest.mark.parametrize("seed", range(8))
+def test_reparse_matches_full_parse(tmp_path, kind, seed):
+    path = str(tmp_path / "p.rejuice")
+    write_rejuice(path, 1500, seed=seed)
+    store, old = load(path)
+    with open(path, "rb") as f:
+        data = mutate(f.read(), kind, random.Random(seed))
+    fresh, _, _ = reparse(path, store, old, data)
+    assert columns(fresh) == columns(PaletteStore.load(path, use_index=False))
+
+
+def test_reparse_only_touches_the_changed_region(tmp_path):
+    path = str(tmp_path / "p.rejuice")
+    write_rejuice(path, 5000)
+    store, old = load(path)
+    i = len(store) // 2
+    pos = store.offsets[i*3 + next(fi for fi in range(3) if store.has(i, fi))]
+    with open(path, "rb") as f:
+        data = f.read()
+    fresh, (k0, k1, m1), _ = reparse(path, store, old, data[:pos] + b"0x12345678" + data[pos+10:])
+    assert k0 <= i < k1 and m1 == k1
+    assert k1 - k0 < 100                    # a chunk or two, not the file
+    assert columns(fresh) == columns(PaletteStore.load(path, use_index=False))
+
+
+def test_carry_edits(tmp_path):
+    path = str(tmp_path / "p.rejuice")
+    names = ["a", "dup", "b", "dup", "c", "gone"]
+    with open(path, "wb") as f:
+        f.write(b"rejuice\x00" + b"".join(
+            entry(n, myPrimaryColor=f"0x0000000{k}", mySecondaryColor="0xff000000")
+            for k, n in enumerate(names)))
+    store, old = load(path)
+    P, S = 0, 1
+    store.set(0, P, 0x11111111)             # untouched by the file: kept
+    store.set(1, P, 0x22222222)             # file made the same change: dropped
+    store.set(3, P, 0x33333333)             # file changed it differently: conflict
+    store.set(4, S, 0x44444444)             # field removed from the file: conflict, lost
+    store.set(5, P, 0x55555555)             # entry removed from the file: conflict, lost
+
+    rows = [entry("new", myPrimaryColor="0x0000abcd"),     # shifts every index by one
+            entry("a", myPrimaryColor="0x00000000", mySecondaryColor="0xff000000"),
+            entry("dup", myPrimaryColor="0x22222222", mySecondaryColor="0xff000000"),
+            entry("b", myPrimaryColor="0x00000002", mySecondaryColor="0xff000000"),
+            entry("dup", myPrimaryColor="0x0000beef", mySecondaryColor="0xff000000"),
+            entry("c", myPrimaryColor="0x00000004")]
+    fresh, span, _ = reparse(path, store, old, b"rejuice\x00" + b"".join(rows))
+    assert columns(fresh) == columns(PaletteStore.load(path, use_index=False))
+
+    conflicts = carry_edits(store, fresh, span)
+    assert fresh.edits == {1*3 + P: 0x11111111, 4*3 + P: 0x33333333}
+    assert conflicts == [
+        (4, P, "dup", 0x00000003, 0x33333333, 0x0000beef),
+        (None, S, "c", 0xff000000, 0x44444444, None),
+        (None, P, "gone", 0x00000005, 0x55555555, None),
+    ]
+
+
+def test_carry_edits_outside_the_changed_region(tmp_path):
+    path = str(tmp_path / "p.rejuice")
+    write_rejuice(path, 3000, missing=0)
+    store, old = load(path)
+    first, last = 0, len(store) - 1
+    store.set(first, 0, 0x01010101)
+    store.set(last, 2, 0x02020202)
+    with open(path, "rb") as f:
+        data = f.read()
+    mid = store.blocks[2 * (len(store) // 2)]
+    fresh, span, _ = reparse(path, store, old,
+                             data[:mid] + entry("zz", myPrimaryColor="0x00000001") + data[mid:])
+    assert span[0] > first and span[1] <= last
+    assert carry_edits(store, fresh, span) == []
+    assert fresh.edits == {first*3: 0x01010101, (last + 1)*3 + 2: 0x02020202}
+
+
+def test_watch_worker(tmp_path):
+    path = str(tmp_path / "p.rejuice")
+    write_rejuice(path, 500)
+    store, old = load(path)
+    with open(path, "rb") as f:
+        data = f.read()
+
+    rewrite(path, data)                     # touched only
+    assert not old.unchanged()
+    out = queue.Queue(); watch_worker(store, old, out)
+    kind, same = out.get()
+    assert kind == "same" and same.digest == old.digest and same.unchanged()
+
+    rewrite(path, data + entry("tail", myTertiaryColor="0x00c0ffee"))
+    out = queue.Queue(); watch_worker(store, same, out)
+    kind, new, fresh, span = out.get()
+    assert kind == "changed" and new.unchanged()
+    assert columns(fresh) == columns(PaletteStore.load(path, use_index=False))
+    assert fresh.name(len(fresh) - 1) == "tail" and fresh.value(len(fresh) - 1, 2) == 0x00c0ffee